@@ -2,23 +2,61 @@
 # Note: This requires Gmail API setup - I'll show you the steps below
 
 import os
+import sys
 import pickle
 import base64
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
+from email.utils import parsedate_to_datetime
 
 # Note: You'll need to install these packages:
 # pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client
 
+GMAIL_BATCH_SIZE = 100  # Gmail accepts at most 100 calls per batch request
+FETCH_WORKERS = 10  # parallel get() calls when batching is unavailable
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)  # refresh access tokens this long before expiry
+METADATA_HEADERS = ('From', 'Subject', 'Date')  # headers used by the notification path
+
+# Notification display: sort rank and emoji per priority
+PRIORITY_ORDER = {'urgent': 1, 'high': 2, 'medium': 3, 'low': 4}
+PRIORITY_EMOJI = {'urgent': '🚨', 'high': '❗', 'medium': '📋', 'low': '💭'}
+
+def parse_email_date(date_str):
+    """Convert an RFC 2822 Date header to Unix epoch seconds (0 if missing or malformed)"""
+    if not date_str:
+        return 0
+    try:
+        return int(parsedate_to_datetime(date_str).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
 class GmailIntegrator:
+    # Matches the same keywords the old substring checks did, in one C-level pass
+    _IMPORTANT_RE = re.compile(
+        r'urgent|important|asap|deadline|meeting|interview|project|submit|payment|invoice',
+        re.IGNORECASE
+    )
+    _IMPORTANT_DOMAINS = frozenset({'work.com', 'university.edu', 'bank.com'})  # Add your important domains
+    # Address at the end of 'user@host' or '"Name" <user@host>' whose host is an
+    # important domain or one of its subdomains (mail.work.com counts as work.com)
+    _IMPORTANT_SENDER_RE = re.compile(
+        r'@(?:[A-Za-z0-9\-]+\.)*(?:' + '|'.join(map(re.escape, sorted(_IMPORTANT_DOMAINS))) + r')>?\s*$',
+        re.IGNORECASE
+    )
+    
     def __init__(self, db_instance):
         """Initialize Gmail integration with database instance"""
         self.db = db_instance
         self.service = None
+        self._messages_resource = None  # cached users().messages() of self.service
+        self.credentials = None
+        self._creds_mtime = None
         self.credentials_path = 'credentials.json'  # Download from Google Cloud Console
-        self.token_path = 'token.pickle'
+        self.token_path = 'token.json'
+        self.legacy_token_path = 'token.pickle'  # migrated to token.json on first run
         
     def setup_gmail_api(self):
         """
@@ -28,24 +66,43 @@ class GmailIntegrator:
         3. Create credentials (OAuth 2.0)
         4. Download credentials.json file
         """
+        # Reuse the cached service while the access token has time left
+        if self.service is not None and self._creds_valid():
+            return True
+        
         try:
             from google.auth.transport.requests import Request
+            from google.oauth2.credentials import Credentials
             from google_auth_oauthlib.flow import InstalledAppFlow
             from googleapiclient.discovery import build
+            import google_auth_httplib2
+            import httplib2
             
             SCOPES = ['https://www.googleapis.com/auth/gmail.readonly',
                      'https://www.googleapis.com/auth/gmail.send']
             
-            creds = None
+            creds = self.credentials
+            creds_changed = False
+            
+            # One-time migration from the old pickle token store
+            if not os.path.exists(self.token_path) and os.path.exists(self.legacy_token_path):
+                with open(self.legacy_token_path, 'rb') as token:
+                    legacy_creds = pickle.load(token)
+                with open(self.token_path, 'w') as token:
+                    token.write(legacy_creds.to_json())
+                os.remove(self.legacy_token_path)
             
-            # Load existing credentials
+            # Load existing credentials (only when the token file changed on disk)
             if os.path.exists(self.token_path):
-                with open(self.token_path, 'rb') as token:
-                    creds = pickle.load(token)
+                mtime = os.path.getmtime(self.token_path)
+                if creds is None or mtime != self._creds_mtime:
+                    with open(self.token_path, 'r') as token:
+                        creds = Credentials.from_authorized_user_info(json.loads(token.read()), SCOPES)
+                    self._creds_mtime = mtime
             
-            # If no valid credentials, get new ones
-            if not creds or not creds.valid:
-                if creds and creds.expired and creds.refresh_token:
+            # If no valid credentials (or about to expire), get new ones
+            if not self._creds_valid(creds):
+                if creds and creds.refresh_token:
                     creds.refresh(Request())
                 else:
                     if not os.path.exists(self.credentials_path):
@@ -61,12 +118,26 @@ class GmailIntegrator:
                         self.credentials_path, SCOPES)
                     creds = flow.run_local_server(port=0)
                 
-                # Save credentials
-                with open(self.token_path, 'wb') as token:
-                    pickle.dump(creds, token)
+                creds_changed = True
             
-            self.service = build('gmail', 'v1', credentials=creds)
-            print("✅ Gmail API connected successfully!")
+            # Save credentials only when they were refreshed or newly issued
+            if creds_changed:
+                with open(self.token_path, 'w') as token:
+                    token.write(creds.to_json())
+                self._creds_mtime = os.path.getmtime(self.token_path)
+            
+            # A refresh updates the credentials in place, so the service (and its
+            # keep-alive HTTP connection) can be kept across checks
+            if self.service is None or creds is not self.credentials:
+                # No HTTP disk cache: it would keep authenticated API responses
+                # (message contents) on disk. The discovery document ships with
+                # googleapiclient, so it needs no cache either.
+                http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+                self.service = build('gmail', 'v1', http=http, cache_discovery=False)
+                self._messages_resource = self.service.users().messages()
+                print("✅ Gmail API connected successfully!")
+            
+            self.credentials = creds
             return True
             
         except ImportError:
@@ -77,39 +148,64 @@ class GmailIntegrator:
             print(f"❌ Gmail setup error: {e}")
             return False
     
-    def fetch_recent_emails(self, max_results=10, query='is:unread'):
-        """Fetch recent emails from Gmail"""
-        if not self.service:
-            if not self.setup_gmail_api():
-                return []
+    def _creds_valid(self, creds=None):
+        """Check that credentials are valid for longer than the refresh margin"""
+        creds = creds or self.credentials
+        if not creds or not creds.valid:
+            return False
+        if creds.expiry is None:
+            return True
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - now > TOKEN_REFRESH_MARGIN
+    
+    def fetch_recent_emails(self, max_results=10, query='is:unread', need_body=True, use_batch=True):
+        """Fetch recent emails from Gmail that are not already in the database
+        
+        With need_body=False only headers, snippet and labels are downloaded
+        (format='metadata'), which is much smaller than the full MIME payload.
+        With use_batch=False messages are fetched from a thread pool instead
+        of batch requests.
+        """
+        if not self.setup_gmail_api():
+            return []
         
         try:
-            # Get list of messages
-            results = self.service.users().messages().list(
+            # Get list of messages (IDs only)
+            results = self._messages_resource.list(
                 userId='me', 
                 q=query, 
-                maxResults=max_results
+                maxResults=max_results,
+                fields='messages/id,nextPageToken'
             ).execute()
             
             messages = results.get('messages', [])
             
+            # Skip messages already stored by an earlier poll (when bodies are
+            # wanted, ones stored by a metadata-only poll are fetched again)
+            known_ids = self.db.get_known_gmail_ids((message['id'] for message in messages),
+                                                    need_body)
+            messages = [message for message in messages if message['id'] not in known_ids]
+            
+            fetched = self.get_messages([message['id'] for message in messages], need_body, use_batch)
+            
             email_data = []
+            rows_to_insert = []
             for message in messages:
-                # Get full message details
-                msg = self.service.users().messages().get(
-                    userId='me', 
-                    id=message['id']
-                ).execute()
+                msg = fetched.get(message['id'])
+                if msg is None:
+                    continue
                 
                 # Extract email details
-                headers = msg['payload'].get('headers', [])
+                headers = self._extract_headers(msg['payload'].get('headers', []))
                 
-                sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-                date_str = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+                sender = headers.get('From', 'Unknown')
+                subject = headers.get('Subject', 'No Subject')
+                date_str = headers.get('Date', '')
+                date_ts = parse_email_date(date_str)
                 
-                # Get email body
-                body = self.extract_email_body(msg['payload'])
+                # Get email body (metadata responses carry no body; stored as NULL)
+                body = self.extract_email_body(msg['payload']) if need_body else None
                 
                 # Get snippet
                 snippet = msg.get('snippet', '')
@@ -124,20 +220,17 @@ class GmailIntegrator:
                     'snippet': snippet,
                     'body': body[:1000] if body else snippet,  # Limit body length
                     'labels': labels,
-                    'date': date_str
+                    'date': date_str,
+                    'date_ts': date_ts
                 }
                 
                 email_data.append(email_info)
                 
-                # Save to database
-                self.db.add_email(
-                    gmail_id=message['id'],
-                    sender=sender,
-                    subject=subject,
-                    snippet=snippet,
-                    body=body,
-                    labels=labels
-                )
+                rows_to_insert.append((message['id'], sender, subject, snippet, body, labels, date_ts))
+            
+            # Save to database in one transaction
+            if rows_to_insert:
+                self.db.add_emails_many(rows_to_insert)
             
             return email_data
             
@@ -145,46 +238,147 @@ class GmailIntegrator:
             print(f"❌ Error fetching emails: {e}")
             return []
     
-    def extract_email_body(self, payload):
-        """Extract email body from payload"""
-        body = ""
+    def refresh_labels(self, max_results=50, query='newer_than:7d'):
+        """Re-read labels and snippet of recent emails that are already stored
         
-        if 'parts' in payload:
-            for part in payload['parts']:
-                if part['mimeType'] == 'text/plain':
-                    data = part['body']['data']
-                    body = base64.urlsafe_b64decode(data).decode('utf-8')
-                    break
-        else:
-            if payload['mimeType'] == 'text/plain':
-                data = payload['body']['data']
-                body = base64.urlsafe_b64decode(data).decode('utf-8')
+        Polls never fetch known messages again, so this is meant to run rarely
+        (the daily review). Returns the number of emails refreshed.
+        """
+        if not self.setup_gmail_api():
+            return 0
+        
+        try:
+            results = self._messages_resource.list(
+                userId='me',
+                q=query,
+                maxResults=max_results,
+                fields='messages/id'
+            ).execute()
+            
+            message_ids = [message['id'] for message in results.get('messages', [])]
+            known_ids = self.db.get_known_gmail_ids(message_ids)
+            refreshed = self.get_messages([message_id for message_id in message_ids
+                                           if message_id in known_ids], need_body=False)
+            
+            # The upsert updates only labels/snippet; a NULL body keeps the stored one
+            rows_to_update = []
+            for message_id, msg in refreshed.items():
+                headers = self._extract_headers(msg['payload'].get('headers', []))
+                rows_to_update.append((message_id, headers.get('From', 'Unknown'),
+                                       headers.get('Subject', 'No Subject'), msg.get('snippet', ''),
+                                       None, msg.get('labelIds', []),
+                                       parse_email_date(headers.get('Date', ''))))
+            
+            if rows_to_update:
+                self.db.add_emails_many(rows_to_update)
+            
+            return len(rows_to_update)
+            
+        except Exception as e:
+            print(f"❌ Error refreshing email labels: {e}")
+            return 0
+    
+    def _extract_headers(self, payload_headers, wanted=METADATA_HEADERS):
+        """Collect the wanted headers into a dict in a single pass (first occurrence wins)"""
+        headers = {}
+        for h in payload_headers:
+            if h['name'] in wanted:
+                headers.setdefault(h['name'], h['value'])
+        return headers
+    
+    def _message_request(self, message_id, need_body=True):
+        """Build a messages().get() request, asking only for metadata when the body isn't needed"""
+        if need_body:
+            return self._messages_resource.get(
+                userId='me', id=message_id, format='full',
+                fields='id,snippet,labelIds,payload')
         
-        return body
+        return self._messages_resource.get(
+            userId='me', id=message_id, format='metadata',
+            metadataHeaders=list(METADATA_HEADERS),
+            fields='id,snippet,labelIds,payload/headers')
+    
+    def get_messages(self, message_ids, need_body=True, use_batch=True):
+        """Fetch message details, batching up to 100 get() calls per HTTP request"""
+        from googleapiclient.errors import HttpError
+        
+        if not use_batch:
+            return self.get_messages_concurrently(message_ids, need_body)
+        
+        fetched = {}
+        
+        def on_message(request_id, response, exception):
+            if exception is not None:
+                print(f"❌ Error fetching email {request_id}: {exception}")
+                return
+            fetched[request_id] = response
+        
+        try:
+            for i in range(0, len(message_ids), GMAIL_BATCH_SIZE):
+                batch = self.service.new_batch_http_request(callback=on_message)
+                for message_id in message_ids[i:i + GMAIL_BATCH_SIZE]:
+                    batch.add(
+                        self._message_request(message_id, need_body),
+                        request_id=message_id
+                    )
+                batch.execute()
+        except HttpError as e:
+            print(f"⚠️  Batch request failed ({e}), fetching emails individually...")
+            remaining = [message_id for message_id in message_ids if message_id not in fetched]
+            fetched.update(self.get_messages_concurrently(remaining, need_body))
+        
+        return fetched
+    
+    def get_messages_concurrently(self, message_ids, need_body=True):
+        """Fallback: issue individual get() calls concurrently from a thread pool"""
+        def fetch(message_id):
+            try:
+                return self.get_message(message_id, need_body)
+            except Exception as e:
+                print(f"❌ Error fetching email {message_id}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            results = executor.map(fetch, message_ids)
+            return {message_id: msg for message_id, msg in zip(message_ids, results)
+                    if msg is not None}
+    
+    def get_message(self, message_id, need_body=True):
+        """Fetch a single message on its own HTTP connection (httplib2 is not thread-safe)"""
+        import httplib2
+        import google_auth_httplib2
+        
+        http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+        return self._message_request(message_id, need_body).execute(http=http)
+    
+    def extract_email_body(self, payload):
+        """Extract the first text/plain body from payload, searching nested parts"""
+        # Iterative depth-first walk, so multipart/alternative inside
+        # multipart/mixed (and deeper nesting) is handled in one pass
+        stack = [payload]
+        while stack:
+            part = stack.pop()
+            data = part.get('body', {}).get('data')
+            if part.get('mimeType') == 'text/plain' and data:
+                return base64.urlsafe_b64decode(data).decode('utf-8', 'replace')
+            # Reversed so parts are visited in document order
+            stack.extend(reversed(part.get('parts', [])))
+        
+        return ""
     
     def analyze_emails_for_notifications(self, emails):
         """Analyze emails and create appropriate notifications"""
-        important_keywords = [
-            'urgent', 'important', 'asap', 'deadline', 'meeting', 
-            'interview', 'project', 'submit', 'payment', 'invoice'
-        ]
-        
         for email in emails:
             priority = 'medium'
             action_required = False
             
             # Check for important keywords
-            text_to_check = (email['subject'] + ' ' + email['snippet']).lower()
-            
-            if any(keyword in text_to_check for keyword in important_keywords):
+            if self._IMPORTANT_RE.search(email['subject']) or self._IMPORTANT_RE.search(email['snippet']):
                 priority = 'high'
                 action_required = True
             
             # Check if from important domains
-            sender_domain = email['sender'].split('@')[-1] if '@' in email['sender'] else ''
-            important_domains = ['work.com', 'university.edu', 'bank.com']  # Add your important domains
-            
-            if any(domain in sender_domain for domain in important_domains):
+            if self._IMPORTANT_SENDER_RE.search(email['sender']):
                 priority = 'high'
             
             # Create notification
@@ -199,7 +393,9 @@ class GmailIntegrator:
         """Check for new emails and create notifications"""
         print("🔍 Checking for new emails...")
         
-        emails = self.fetch_recent_emails(max_results=5, query='is:unread newer_than:1h')
+        # Notifications only use sender, subject and snippet, so skip the bodies
+        emails = self.fetch_recent_emails(max_results=5, query='is:unread newer_than:1h',
+                                          need_body=False)
         
         if emails:
             print(f"📧 Found {len(emails)} recent unread emails")
@@ -258,33 +454,32 @@ class NotificationManager:
             print("🎉 No pending notifications!")
             return
         
-        print("\n" + "="*60)
-        print("📢 PENDING NOTIFICATIONS")
-        print("="*60)
+        # Build the whole listing and write it in one call
+        out = []
+        out.append("\n" + "="*60)
+        out.append("📢 PENDING NOTIFICATIONS")
+        out.append("="*60)
         
-        priority_order = {'urgent': 1, 'high': 2, 'medium': 3, 'low': 4}
         sorted_notifications = sorted(notifications, 
-                                    key=lambda x: priority_order.get(x[4], 5))
+                                    key=lambda x: PRIORITY_ORDER.get(x['priority'], 5))
         
         for notif in sorted_notifications:
-            id, type, title, message, priority, is_read, scheduled_for, created_at, action_required, metadata = notif
+            id, type, title, message, priority, created_at, action_required = notif
             
             # Priority emoji
-            priority_emoji = {
-                'urgent': '🚨',
-                'high': '❗',
-                'medium': '📋',
-                'low': '💭'
-            }.get(priority, '📌')
+            priority_emoji = PRIORITY_EMOJI.get(priority, '📌')
             
-            print(f"\n{priority_emoji} {title}")
-            print(f"   Type: {type.upper()} | Priority: {priority.upper()}")
+            out.append(f"\n{priority_emoji} {title}")
+            out.append(f"   Type: {type.upper()} | Priority: {priority.upper()}")
             if message:
-                print(f"   {message[:100]}{'...' if len(message) > 100 else ''}")
-            print(f"   Created: {created_at}")
+                out.append(f"   {message[:100]}{'...' if len(message) > 100 else ''}")
+            out.append(f"   Created: {created_at}")
             
             if action_required:
-                print("   ⚠️  ACTION REQUIRED")
+                out.append("   ⚠️  ACTION REQUIRED")
+        
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
 
 # Gmail API Setup Instructions
 def print_gmail_setup_instructions():
@@ -5,9 +5,8 @@ Integrates Gmail, Study Assistant, Notifications, and Claude Desktop
 """
 
 import schedule
-import time
 import threading
-import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import json
 import os
@@ -16,13 +15,28 @@ import sys
 # Import our modules (make sure all files are in the same directory)
 try:
     from personal_assistant_db import PersonalAssistantDB
-    from gmail_integration import GmailIntegrator, NotificationManager
+    from gmail_integration import GmailIntegrator, NotificationManager, PRIORITY_EMOJI
     from study_assistant import StudyAssistant, NLPLearningAssistant
 except ImportError as e:
     print(f"❌ Import error: {e}")
     print("Make sure all assistant files are in the same directory")
     sys.exit(1)
 
+# Optional: orjson's C encoder makes the Claude exports much faster (pip install orjson)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def write_json(path, data):
+    """Write data to path as indented JSON"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
 class PersonalAssistant:
     def __init__(self):
         """Initialize the personal assistant"""
@@ -45,6 +59,13 @@ class PersonalAssistant:
             'notification_priority_filter': 'medium'  # show medium and above
         }
         
+        # Set to stop the background scheduler
+        self._stop = threading.Event()
+        
+        # Slow jobs (Gmail) run here so the scheduler thread is never blocked
+        self._pool = ThreadPoolExecutor(max_workers=2)
+        self._email_check_lock = threading.Lock()
+        
         print("✅ Personal Assistant initialized!")
     
     def start_background_services(self):
@@ -65,17 +86,39 @@ class PersonalAssistant:
         
         # Start scheduler in background thread
         def run_scheduler():
-            while True:
+            while not self._stop.is_set():
                 schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                # Sleep until the next job is due (re-check at least every 5 minutes
+                # in case the clock jumps); stop_background_services() wakes us early
+                idle = schedule.idle_seconds()
+                timeout = 60 if idle is None else min(max(idle, 0), 300)
+                self._stop.wait(timeout=timeout)
         
         scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
         scheduler_thread.start()
         
         print("✅ Background services started!")
     
+    def stop_background_services(self):
+        """Stop the background scheduler thread and the worker pool"""
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+    
     def check_emails_background(self):
-        """Background email checking"""
+        """Background email checking (returns immediately, the check runs in the pool)"""
+        # Skip this tick if the previous check is still running
+        if not self._email_check_lock.acquire(blocking=False):
+            print("📧 Previous email check still running, skipping")
+            return
+        
+        try:
+            self._pool.submit(self._run_email_check)
+        except RuntimeError:
+            # Pool already shut down
+            self._email_check_lock.release()
+    
+    def _run_email_check(self):
+        """Run one email check and release the overlap guard"""
         print("📧 Checking emails...")
         try:
             emails = self.gmail_integrator.check_and_notify_new_emails()
@@ -83,20 +126,17 @@ class PersonalAssistant:
                 print(f"   Found {len(emails)} new emails")
         except Exception as e:
             print(f"   Email check error: {e}")
+        finally:
+            self._email_check_lock.release()
     
     def create_study_reminder(self):
         """Create study reminder notifications"""
         # Check if user has studied today
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT SUM(duration_minutes) FROM study_sessions 
-            WHERE session_date = ?
-        ''', (datetime.now().date(),))
-        
-        today_minutes = cursor.fetchone()[0] or 0
-        conn.close()
+        with self.db.connection() as conn:
+            today_minutes = conn.execute('''
+                SELECT COALESCE(SUM(duration_minutes), 0) FROM study_sessions 
+                WHERE session_date = ?
+            ''', (datetime.now().date().isoformat(),)).fetchone()[0]
         
         if today_minutes < self.settings['daily_study_goal']:
             remaining = self.settings['daily_study_goal'] - today_minutes
@@ -110,8 +150,8 @@ class PersonalAssistant:
         progress = self.db.get_study_progress(days=1)
         
         if progress:
-            total_time = sum(p[2] for p in progress) / 60  # convert to hours
-            subjects = [p[0] for p in progress]
+            total_time = sum(p['total_minutes'] for p in progress) / 60  # convert to hours
+            subjects = [p['subject'] for p in progress]
             
             summary = f"📊 Daily Summary: {total_time:.1f}h studied across {', '.join(subjects)}"
         else:
@@ -123,6 +163,14 @@ class PersonalAssistant:
             message=summary,
             priority='low'
         )
+        
+        # Once a day, pick up label/snippet changes of stored emails (off the
+        # scheduler thread, like the email checks)
+        try:
+            self._pool.submit(self.gmail_integrator.refresh_labels)
+        except RuntimeError:
+            # Pool already shut down
+            pass
     
     def get_dashboard_info(self):
         """Get dashboard information"""
@@ -146,33 +194,25 @@ class PersonalAssistant:
     
     def get_quick_stats(self):
         """Get quick statistics"""
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        
-        # Total study hours this week
-        week_ago = datetime.now().date() - timedelta(days=7)
-        cursor.execute('''
-            SELECT SUM(duration_minutes) FROM study_sessions 
-            WHERE session_date >= ?
-        ''', (week_ago,))
+        week_ago = (datetime.now().date() - timedelta(days=7)).isoformat()
+        
+        # Week study minutes, unread notifications, active projects and
+        # learning resources in a single round trip
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT
+                    (SELECT COALESCE(SUM(duration_minutes), 0) FROM study_sessions
+                     WHERE session_date >= ?),
+                    (SELECT COUNT(*) FROM notifications WHERE is_read = FALSE),
+                    (SELECT COUNT(*) FROM coding_projects WHERE status = 'active'),
+                    (SELECT COUNT(*) FROM learning_resources)
+            ''', (week_ago,))
+            
+            week_minutes, unread_notifications, active_projects, total_resources = cursor.fetchone()
         
-        week_minutes = cursor.fetchone()[0] or 0
         week_hours = week_minutes / 60
         
-        # Unread notifications count
-        cursor.execute('SELECT COUNT(*) FROM notifications WHERE is_read = FALSE')
-        unread_notifications = cursor.fetchone()[0]
-        
-        # Active projects count
-        cursor.execute('SELECT COUNT(*) FROM coding_projects WHERE status = "active"')
-        active_projects = cursor.fetchone()[0]
-        
-        # Learning resources count
-        cursor.execute('SELECT COUNT(*) FROM learning_resources')
-        total_resources = cursor.fetchone()[0]
-        
-        conn.close()
-        
         return {
             'week_study_hours': round(week_hours, 1),
             'unread_notifications': unread_notifications,
@@ -184,42 +224,47 @@ class PersonalAssistant:
         """Display the main dashboard"""
         dashboard = self.get_dashboard_info()
         
-        print("\n" + "="*80)
-        print("🤖 PERSONAL ASSISTANT DASHBOARD")
-        print("="*80)
+        # Build the whole dashboard and write it in one call
+        out = []
+        out.append("\n" + "="*80)
+        out.append("🤖 PERSONAL ASSISTANT DASHBOARD")
+        out.append("="*80)
         
         # Quick Stats
         stats = dashboard['quick_stats']
-        print(f"📊 QUICK STATS:")
-        print(f"   📚 Study Hours (This Week): {stats['week_study_hours']}h")
-        print(f"   🔔 Unread Notifications: {stats['unread_notifications']}")
-        print(f"   💻 Active Projects: {stats['active_projects']}")
-        print(f"   📖 Learning Resources: {stats['learning_resources']}")
+        out.append(f"📊 QUICK STATS:")
+        out.append(f"   📚 Study Hours (This Week): {stats['week_study_hours']}h")
+        out.append(f"   🔔 Unread Notifications: {stats['unread_notifications']}")
+        out.append(f"   💻 Active Projects: {stats['active_projects']}")
+        out.append(f"   📖 Learning Resources: {stats['learning_resources']}")
         
         # Recent Notifications
-        print(f"\n🔔 RECENT NOTIFICATIONS:")
+        out.append(f"\n🔔 RECENT NOTIFICATIONS:")
         notifications = dashboard['notifications']
         if notifications:
             for notif in notifications[:3]:
-                priority_emoji = {'urgent': '🚨', 'high': '❗', 'medium': '📋', 'low': '💭'}.get(notif[4], '📌')
-                print(f"   {priority_emoji} {notif[2]} ({notif[1]})")
+                priority_emoji = PRIORITY_EMOJI.get(notif['priority'], '📌')
+                out.append(f"   {priority_emoji} {notif['title']} ({notif['type']})")
         else:
-            print("   ✅ No pending notifications!")
+            out.append("   ✅ No pending notifications!")
         
         # Study Progress
-        print(f"\n📚 RECENT STUDY ACTIVITY:")
+        out.append(f"\n📚 RECENT STUDY ACTIVITY:")
         progress = dashboard['recent_study']
         if progress:
             for subject, sessions, total_minutes in progress:
                 hours = total_minutes / 60
-                print(f"   • {subject}: {sessions} sessions, {hours:.1f}h")
+                out.append(f"   • {subject}: {sessions} sessions, {hours:.1f}h")
         else:
-            print("   📝 No recent study sessions")
+            out.append("   📝 No recent study sessions")
         
         # Study Suggestions
-        print(f"\n💡 STUDY SUGGESTIONS:")
+        out.append(f"\n💡 STUDY SUGGESTIONS:")
         for suggestion in dashboard['study_suggestions']:
-            print(f"   • {suggestion['subject'].upper()}: {suggestion['topic']}")
+            out.append(f"   • {suggestion['subject'].upper()}: {suggestion['topic']}")
+        
+        sys.stdout.write("\n".join(out) + "\n")
+        sys.stdout.flush()
     
     def claude_desktop_integration(self):
         """Instructions for Claude Desktop integration"""
@@ -260,58 +305,40 @@ class PersonalAssistant:
     
     def export_data_for_claude(self, output_dir="assistant_data"):
         """Export data in formats that Claude Desktop can use"""
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir)
+        os.makedirs(output_dir, exist_ok=True)
         
         # Export current progress
         progress_data = {
             'last_updated': datetime.now().isoformat(),
-            'study_progress': self.db.get_study_progress(days=14),
+            'study_progress': [dict(row) for row in self.db.get_study_progress(days=14)],
             'quick_stats': self.get_quick_stats(),
             'recent_sessions': []
         }
         
-        # Get recent study sessions
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT subject, topic, duration_minutes, session_date, progress_notes 
-            FROM study_sessions 
-            WHERE session_date >= ? 
-            ORDER BY session_date DESC
-        ''', (datetime.now().date() - timedelta(days=7),))
-        
-        sessions = cursor.fetchall()
-        for session in sessions:
-            progress_data['recent_sessions'].append({
-                'subject': session[0],
-                'topic': session[1],
-                'duration_minutes': session[2],
-                'date': session[3],
-                'notes': session[4]
-            })
-        
-        conn.close()
+        # Get recent study sessions (column aliases match the export keys)
+        with self.db.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT subject, topic, duration_minutes, 
+                       session_date AS date, progress_notes AS notes 
+                FROM study_sessions 
+                WHERE session_date >= ? 
+                ORDER BY session_date DESC
+            ''', ((datetime.now().date() - timedelta(days=7)).isoformat(),))
+            
+            progress_data['recent_sessions'] = [dict(row) for row in cursor]
         
         # Save files
-        with open(f"{output_dir}/current_progress.json", 'w') as f:
-            json.dump(progress_data, f, indent=2)
+        write_json(f"{output_dir}/current_progress.json", progress_data)
         
         # Export notifications
         notifications = self.db.get_pending_notifications()
-        notif_data = []
-        for notif in notifications:
-            notif_data.append({
-                'id': notif[0],
-                'type': notif[1],
-                'title': notif[2],
-                'message': notif[3],
-                'priority': notif[4],
-                'created_at': notif[7]
-            })
+        notif_data = [
+            {key: notif[key] for key in ('id', 'type', 'title', 'message', 'priority', 'created_at')}
+            for notif in notifications
+        ]
         
-        with open(f"{output_dir}/notifications.json", 'w') as f:
-            json.dump(notif_data, f, indent=2)
+        write_json(f"{output_dir}/notifications.json", notif_data)
         
         # Create quick commands guide
         commands_md = """# Quick Commands for Claude
@@ -353,6 +380,14 @@ def main_menu():
     # Start background services
     assistant.start_background_services()
     
+    # Stop the scheduler and the worker pool however the menu is left
+    try:
+        _run_main_menu(assistant)
+    finally:
+        assistant.stop_background_services()
+
+def _run_main_menu(assistant):
+    """Show the dashboard and main menu until the user exits"""
     while True:
         try:
             assistant.display_dashboard()
@@ -388,16 +423,10 @@ def main_menu():
                 # Option to mark as read
                 notif_input = input("\nMark notification as read? (enter ID or 'all'): ").strip()
                 if notif_input.lower() == 'all':
-                    conn = sqlite3.connect(assistant.db.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute("UPDATE notifications SET is_read = TRUE")
-                    conn.commit()
-                    conn.close()
+                    with assistant.db.connection() as conn:
+                        conn.execute("UPDATE notifications SET is_read = TRUE")
                     print("✅ All notifications marked as read")
                 elif notif_input.isdigit():
-                    conn = sqlite3.connect(assistant.db.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute("UPDATE notifications SET is_read = TRUE WHERE id = ?", (int(notif_input),))
-                    conn.commit()
-                    conn.close()
+                    with assistant.db.connection() as conn:
+                        conn.execute("UPDATE notifications SET is_read = TRUE WHERE id = ?", (int(notif_input),))
                     print("✅ Notification marked as read")
\ No newline at end of file
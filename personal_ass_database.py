@@ -1,345 +1,646 @@
-import sqlite3
+# Optional: pysqlite3 bundles a newer SQLite than many Python builds link
+# against (pip install pysqlite3-binary); the API is identical
+try:
+    import pysqlite3 as sqlite3
+except ImportError:
+    import sqlite3
 import json
+import queue
+import threading
+from contextlib import closing, contextmanager
 from datetime import datetime, timedelta
 import os
 
+# Optional: orjson's C encoder for the JSON columns (pip install orjson)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Notification priority is stored as an integer so it sorts correctly
+PRIORITY_LEVELS = {'low': 1, 'medium': 2, 'high': 3, 'urgent': 4}
+PRIORITY_NAMES = {level: name for name, level in PRIORITY_LEVELS.items()}
+
+# SQL for the hot insert/select paths. Keeping each statement as one shared
+# string lets sqlite3's per-connection statement cache reuse the compiled
+# program instead of re-parsing the SQL on every call. Insert timestamps are
+# filled in by SQLite itself, in local time to match the date filters.
+SQL_STATEMENTS = {
+    # Re-seen emails refresh their labels/snippet in the same statement, and
+    # get their body if it wasn't fetched before (NULL); the WHERE skips the
+    # write (and the FTS trigger) when nothing changed
+    'INSERT_EMAIL': '''
+        INSERT INTO emails 
+        (gmail_id, sender, subject, snippet, body, received_date, labels, date_ts)
+        VALUES (?, ?, ?, ?, ?, DATETIME('now', 'localtime'), ?, ?)
+        ON CONFLICT(gmail_id) DO UPDATE SET 
+            labels = excluded.labels, snippet = excluded.snippet,
+            body = COALESCE(body, excluded.body)
+        WHERE labels IS NOT excluded.labels OR snippet IS NOT excluded.snippet
+              OR (body IS NULL AND excluded.body IS NOT NULL)
+    ''',
+    'INSERT_NOTIFICATION': '''
+        INSERT INTO notifications (type, title, message, priority, scheduled_for)
+        VALUES (?, ?, ?, ?, ?)
+    ''',
+    'INSERT_STUDY_SESSION': '''
+        INSERT INTO study_sessions 
+        (subject, topic, duration_minutes, study_type, session_date)
+        VALUES (?, ?, ?, ?, DATE('now', 'localtime'))
+    ''',
+    'INSERT_LEARNING_RESOURCE': '''
+        INSERT INTO learning_resources 
+        (title, type, subject, url, description)
+        VALUES (?, ?, ?, ?, ?)
+    ''',
+    'INSERT_CODING_PROJECT': '''
+        INSERT INTO coding_projects 
+        (name, description, language, local_path)
+        VALUES (?, ?, ?, ?)
+    ''',
+    'INSERT_NLP_TASK': '''
+        INSERT INTO nlp_tasks 
+        (task_name, task_type, dataset_name, model_used)
+        VALUES (?, ?, ?, ?)
+    ''',
+    'SELECT_PENDING_NOTIFICATIONS': '''
+        SELECT id, type, title, message, priority, created_at, action_required
+        FROM notifications 
+        WHERE is_read = FALSE 
+        ORDER BY priority DESC, created_at DESC
+    ''',
+    'SELECT_STUDY_PROGRESS': '''
+        SELECT subject, COUNT(*) as sessions, SUM(duration_minutes) as total_minutes
+        FROM study_sessions 
+        WHERE session_date >= ?
+        GROUP BY subject
+        ORDER BY total_minutes DESC
+    ''',
+    'SELECT_STUDY_PROGRESS_SUBJECT': '''
+        SELECT subject, COUNT(*) as sessions, SUM(duration_minutes) as total_minutes
+        FROM study_sessions 
+        WHERE session_date >= ? AND subject = ?
+        GROUP BY subject
+    ''',
+    'SEARCH_EMAILS': '''
+        SELECT e.id, e.gmail_id, e.sender, e.subject, e.snippet, e.received_date
+        FROM emails_fts f JOIN emails e ON e.id = f.rowid
+        WHERE emails_fts MATCH ?
+        ORDER BY f.rank
+        LIMIT ?
+    ''',
+    'SEARCH_EMAILS_LIKE': '''
+        SELECT id, gmail_id, sender, subject, snippet, received_date
+        FROM emails
+        WHERE subject LIKE ? ESCAPE '\\' OR snippet LIKE ? ESCAPE '\\' OR body LIKE ? ESCAPE '\\'
+        ORDER BY received_date DESC
+        LIMIT ?
+    ''',
+}
+
+def priority_level(name):
+    """Stored integer level for a priority name such as 'high'"""
+    try:
+        return PRIORITY_LEVELS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown priority {name!r}; "
+                         f"expected one of: {', '.join(PRIORITY_LEVELS)}") from None
+
+def _pending_notification_row(cursor, row):
+    """Row factory for SELECT_PENDING_NOTIFICATIONS: priority (column 4) comes back as its name"""
+    return sqlite3.Row(cursor, row[:4] + (PRIORITY_NAMES.get(row[4], 'low'),) + row[5:])
+
+def dump_json(value):
+    """Serialize value for a JSON TEXT column, without insignificant whitespace"""
+    if orjson is not None:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+class TunedConnection(sqlite3.Connection):
+    """Connection that applies the PRAGMA recipe once, when it is opened"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Rows support both name and position lookup (row['title'] / row[2])
+        self.row_factory = sqlite3.Row
+        self.execute("PRAGMA journal_mode=WAL")
+        self.execute("PRAGMA synchronous=NORMAL")
+        self.execute("PRAGMA temp_store=MEMORY")
+        self.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
+        self.execute("PRAGMA mmap_size=2147483648")
+        self.execute("PRAGMA busy_timeout=5000")
+
+class ConnectionPool:
+    """Keeps opened connections for reuse instead of closing and reopening them"""
+    
+    def __init__(self, db_path, size=4):
+        self.db_path = db_path
+        self._idle = queue.LifoQueue(maxsize=size)
+    
+    def open(self):
+        """Open a new tuned autocommit connection usable from any thread"""
+        return sqlite3.connect(self.db_path, factory=TunedConnection, check_same_thread=False,
+                               isolation_level=None, cached_statements=256)
+    
+    @contextmanager
+    def connection(self):
+        """Borrow an idle connection (opening one if none is free) and hand it back after"""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self.open()
+        
+        try:
+            yield conn
+        finally:
+            # Never hand a connection with a half-finished transaction to the next borrower
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
 class PersonalAssistantDB:
     def __init__(self, db_path="personal_assistant.db"):
         """Initialize the personal assistant database"""
         self.db_path = db_path
+        
+        # One long-lived connection shared by the UI and the scheduler thread
+        # for writes; read-only queries borrow from the pool so they don't wait
+        # on the lock (WAL lets them run alongside a writer)
+        self._pool = ConnectionPool(self.db_path)
+        self._conn = self._pool.open()
+        self._lock = threading.RLock()
+        self._stmts = SQL_STATEMENTS
+        
         self.init_database()
     
+    @contextmanager
+    def connection(self):
+        """Borrow the shared connection (autocommit), serialized across threads"""
+        with self._lock:
+            yield self._conn
+    
+    def close(self):
+        """Close the shared connection and any pooled ones"""
+        with self._lock:
+            self._conn.close()
+            self._pool.close()
+    
+    def execute(self, sql, params=()):
+        """Run one statement on the shared connection and return all result rows"""
+        with self.connection() as conn, closing(conn.execute(sql, params)) as cursor:
+            return cursor.fetchall()
+    
+    def bulk(self):
+        """Group many writes into one transaction: `with db.bulk(): ...`"""
+        return self._transaction()
+    
+    @contextmanager
+    def _transaction(self):
+        """Run several statements on the shared connection as one transaction"""
+        with self._lock:
+            if self._conn.in_transaction:
+                # Already inside an outer transaction; let it commit
+                yield self._conn
+                return
+            
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+    
     def init_database(self):
         """Create all necessary tables for the personal assistant"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Gmail/Email tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS emails (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                gmail_id TEXT UNIQUE,
-                sender TEXT,
-                subject TEXT,
-                snippet TEXT,
-                body TEXT,
-                received_date TIMESTAMP,
-                is_read BOOLEAN DEFAULT FALSE,
-                is_important BOOLEAN DEFAULT FALSE,
-                labels TEXT,  -- JSON array of labels
-                attachments TEXT,  -- JSON array of attachment info
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Notifications system
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                type TEXT NOT NULL,  -- 'email', 'reminder', 'study', 'coding'
-                title TEXT NOT NULL,
-                message TEXT,
-                priority TEXT DEFAULT 'medium',  -- 'low', 'medium', 'high', 'urgent'
-                is_read BOOLEAN DEFAULT FALSE,
-                scheduled_for TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                action_required BOOLEAN DEFAULT FALSE,
-                metadata TEXT  -- JSON for additional data
-            )
-        ''')
-        
-        # Study/Learning tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS study_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                subject TEXT NOT NULL,
-                topic TEXT,
-                duration_minutes INTEGER,
-                study_type TEXT,  -- 'reading', 'practice', 'video', 'coding', 'nlp'
-                progress_notes TEXT,
-                difficulty_rating INTEGER CHECK (difficulty_rating BETWEEN 1 AND 5),
-                session_date DATE,
-                goals TEXT,  -- JSON array of session goals
-                achievements TEXT,  -- JSON array of what was accomplished
-                next_steps TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Learning resources/materials
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS learning_resources (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                type TEXT,  -- 'book', 'video', 'article', 'course', 'tutorial'
-                subject TEXT,  -- 'coding', 'nlp', 'general'
-                url TEXT,
-                local_path TEXT,
-                description TEXT,
-                progress_percentage INTEGER DEFAULT 0,
-                rating INTEGER CHECK (rating BETWEEN 1 AND 5),
-                notes TEXT,
-                tags TEXT,  -- JSON array
-                added_date DATE DEFAULT (DATE('now')),
-                completed_date DATE,
-                is_favorite BOOLEAN DEFAULT FALSE
-            )
-        ''')
-        
-        # Coding projects and progress
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS coding_projects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                description TEXT,
-                language TEXT,  -- 'python', 'javascript', etc.
-                github_url TEXT,
-                local_path TEXT,
-                status TEXT DEFAULT 'active',  -- 'planning', 'active', 'paused', 'completed'
-                difficulty TEXT DEFAULT 'medium',
-                technologies TEXT,  -- JSON array
-                goals TEXT,  -- JSON array
-                progress_notes TEXT,
-                last_worked_date DATE,
-                created_date DATE DEFAULT (DATE('now')),
-                estimated_hours INTEGER,
-                actual_hours INTEGER DEFAULT 0
-            )
-        ''')
-        
-        # NLP tasks and experiments
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS nlp_tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task_name TEXT NOT NULL,
-                task_type TEXT,  -- 'sentiment_analysis', 'text_classification', 'ner', etc.
-                dataset_name TEXT,
-                model_used TEXT,
-                accuracy_score REAL,
-                parameters TEXT,  -- JSON of model parameters
-                notes TEXT,
-                code_path TEXT,
-                results_path TEXT,
-                created_date DATE DEFAULT (DATE('now')),
-                completion_date DATE,
-                status TEXT DEFAULT 'in_progress'  -- 'planning', 'in_progress', 'completed', 'failed'
-            )
-        ''')
-        
-        # Daily goals and habits
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS daily_goals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                goal TEXT NOT NULL,
-                category TEXT,  -- 'study', 'coding', 'health', 'personal'
-                target_date DATE,
-                is_completed BOOLEAN DEFAULT FALSE,
-                completion_date DATE,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Assistant conversations/interactions
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS assistant_interactions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                interaction_type TEXT,  -- 'query', 'task_help', 'study_help', 'notification'
-                user_input TEXT,
-                assistant_response TEXT,
-                context_data TEXT,  -- JSON of relevant context
-                satisfaction_rating INTEGER CHECK (satisfaction_rating BETWEEN 1 AND 5),
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+        with self._transaction() as conn:
+            cursor = conn.cursor()
+            
+            # Gmail/Email tracking
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS emails (
+                    id INTEGER PRIMARY KEY,
+                    gmail_id TEXT UNIQUE,
+                    sender TEXT,
+                    subject TEXT,
+                    snippet TEXT,
+                    body TEXT,
+                    received_date TIMESTAMP DEFAULT (DATETIME('now', 'localtime')),
+                    date_ts INTEGER,  -- Date header as Unix epoch seconds
+                    is_read BOOLEAN DEFAULT FALSE,
+                    is_important BOOLEAN DEFAULT FALSE,
+                    labels TEXT,  -- JSON array of labels
+                    attachments TEXT,  -- JSON array of attachment info
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Notifications used to store priority as TEXT; move that table
+            # aside so it is recreated below and copied over with integer levels
+            cursor.execute("PRAGMA table_info(notifications)")
+            priority_types = [row[2] for row in cursor.fetchall() if row[1] == 'priority']
+            migrate_priority = priority_types and priority_types[0].upper() == 'TEXT'
+            if migrate_priority:
+                cursor.execute('ALTER TABLE notifications RENAME TO notifications_old')
+            
+            # Notifications system
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS notifications (
+                    id INTEGER PRIMARY KEY,
+                    type TEXT NOT NULL,  -- 'email', 'reminder', 'study', 'coding'
+                    title TEXT NOT NULL,
+                    message TEXT,
+                    priority INTEGER NOT NULL DEFAULT 2 CHECK (priority BETWEEN 1 AND 4),  -- 1 low .. 4 urgent
+                    is_read BOOLEAN DEFAULT FALSE,
+                    scheduled_for TIMESTAMP,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    action_required BOOLEAN DEFAULT FALSE,
+                    metadata TEXT  -- JSON for additional data
+                )
+            ''')
+            
+            if migrate_priority:
+                # Unknown or missing names become 'medium', the old column default
+                conn.create_function(
+                    'migrated_priority_level', 1,
+                    lambda name: PRIORITY_LEVELS.get((name or '').lower(), PRIORITY_LEVELS['medium']),
+                    deterministic=True)
+                cursor.execute('''
+                    INSERT INTO notifications 
+                    (id, type, title, message, priority, is_read, scheduled_for, 
+                     created_at, action_required, metadata)
+                    SELECT id, type, title, message,
+                           migrated_priority_level(priority),
+                           is_read, scheduled_for, created_at, action_required, metadata
+                    FROM notifications_old
+                ''')
+                cursor.execute('DROP TABLE notifications_old')
+            
+            # Study/Learning tracking
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS study_sessions (
+                    id INTEGER PRIMARY KEY,
+                    subject TEXT NOT NULL,
+                    topic TEXT,
+                    duration_minutes INTEGER,
+                    study_type TEXT,  -- 'reading', 'practice', 'video', 'coding', 'nlp'
+                    progress_notes TEXT,
+                    difficulty_rating INTEGER CHECK (difficulty_rating BETWEEN 1 AND 5),
+                    session_date DATE DEFAULT (DATE('now', 'localtime')),
+                    goals TEXT,  -- JSON array of session goals
+                    achievements TEXT,  -- JSON array of what was accomplished
+                    next_steps TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Learning resources/materials
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS learning_resources (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    type TEXT,  -- 'book', 'video', 'article', 'course', 'tutorial'
+                    subject TEXT,  -- 'coding', 'nlp', 'general'
+                    url TEXT,
+                    local_path TEXT,
+                    description TEXT,
+                    progress_percentage INTEGER DEFAULT 0,
+                    rating INTEGER CHECK (rating BETWEEN 1 AND 5),
+                    notes TEXT,
+                    tags TEXT,  -- JSON array
+                    added_date DATE DEFAULT (DATE('now')),
+                    completed_date DATE,
+                    is_favorite BOOLEAN DEFAULT FALSE
+                )
+            ''')
+            
+            # Coding projects and progress
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS coding_projects (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    description TEXT,
+                    language TEXT,  -- 'python', 'javascript', etc.
+                    github_url TEXT,
+                    local_path TEXT,
+                    status TEXT DEFAULT 'active',  -- 'planning', 'active', 'paused', 'completed'
+                    difficulty TEXT DEFAULT 'medium',
+                    technologies TEXT,  -- JSON array
+                    goals TEXT,  -- JSON array
+                    progress_notes TEXT,
+                    last_worked_date DATE,
+                    created_date DATE DEFAULT (DATE('now')),
+                    estimated_hours INTEGER,
+                    actual_hours INTEGER DEFAULT 0
+                )
+            ''')
+            
+            # NLP tasks and experiments
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS nlp_tasks (
+                    id INTEGER PRIMARY KEY,
+                    task_name TEXT NOT NULL,
+                    task_type TEXT,  -- 'sentiment_analysis', 'text_classification', 'ner', etc.
+                    dataset_name TEXT,
+                    model_used TEXT,
+                    accuracy_score REAL,
+                    parameters TEXT,  -- JSON of model parameters
+                    notes TEXT,
+                    code_path TEXT,
+                    results_path TEXT,
+                    created_date DATE DEFAULT (DATE('now')),
+                    completion_date DATE,
+                    status TEXT DEFAULT 'in_progress'  -- 'planning', 'in_progress', 'completed', 'failed'
+                )
+            ''')
+            
+            # Daily goals and habits
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS daily_goals (
+                    id INTEGER PRIMARY KEY,
+                    goal TEXT NOT NULL,
+                    category TEXT,  -- 'study', 'coding', 'health', 'personal'
+                    target_date DATE,
+                    is_completed BOOLEAN DEFAULT FALSE,
+                    completion_date DATE,
+                    notes TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Assistant conversations/interactions
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS assistant_interactions (
+                    id INTEGER PRIMARY KEY,
+                    interaction_type TEXT,  -- 'query', 'task_help', 'study_help', 'notification'
+                    user_input TEXT,
+                    assistant_response TEXT,
+                    context_data TEXT,  -- JSON of relevant context
+                    satisfaction_rating INTEGER CHECK (satisfaction_rating BETWEEN 1 AND 5),
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Add columns introduced after the table was first created
+            cursor.execute("PRAGMA table_info(emails)")
+            email_columns = {row[1] for row in cursor.fetchall()}
+            if 'date_ts' not in email_columns:
+                cursor.execute('ALTER TABLE emails ADD COLUMN date_ts INTEGER')
+            
+            # Indexes for the dashboard and scheduler queries
+            # (emails.gmail_id is already indexed by its UNIQUE constraint)
+            # Covering index: get_study_progress never touches the table itself
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_sessions_date_subject 
+                ON study_sessions(session_date, subject, duration_minutes)
+            ''')
+            # Covering index for get_study_progress(subject=...)
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_sessions_subject_date 
+                ON study_sessions(subject, session_date DESC, duration_minutes)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_notif_unread 
+                ON notifications(priority DESC, created_at DESC) WHERE is_read = FALSE
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_projects_status 
+                ON coding_projects(status)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_emails_date_ts 
+                ON emails(date_ts)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_emails_received 
+                ON emails(received_date DESC)
+            ''')
+            
+            # Full-text index over the email text, kept in sync by triggers
+            try:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'emails_fts'")
+                fts_existed = cursor.fetchone() is not None
+                cursor.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS emails_fts USING fts5(
+                        subject, snippet, body,
+                        content='emails', content_rowid='id',
+                        tokenize='porter unicode61'
+                    )
+                ''')
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS emails_fts_insert AFTER INSERT ON emails BEGIN
+                        INSERT INTO emails_fts(rowid, subject, snippet, body)
+                        VALUES (new.id, new.subject, new.snippet, new.body);
+                    END
+                ''')
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS emails_fts_delete AFTER DELETE ON emails BEGIN
+                        INSERT INTO emails_fts(emails_fts, rowid, subject, snippet, body)
+                        VALUES ('delete', old.id, old.subject, old.snippet, old.body);
+                    END
+                ''')
+                cursor.execute('''
+                    CREATE TRIGGER IF NOT EXISTS emails_fts_update 
+                    AFTER UPDATE OF subject, snippet, body ON emails BEGIN
+                        INSERT INTO emails_fts(emails_fts, rowid, subject, snippet, body)
+                        VALUES ('delete', old.id, old.subject, old.snippet, old.body);
+                        INSERT INTO emails_fts(rowid, subject, snippet, body)
+                        VALUES (new.id, new.subject, new.snippet, new.body);
+                    END
+                ''')
+                if not fts_existed:
+                    # Index emails stored before the FTS table existed
+                    cursor.execute("INSERT INTO emails_fts(emails_fts) VALUES ('rebuild')")
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # This SQLite build has no FTS5; search_emails falls back to LIKE
+                self.has_fts = False
+        
+        # Refresh planner statistics for any index that needs it
+        with self.connection() as conn:
+            conn.execute('PRAGMA optimize')
         
-        conn.commit()
-        conn.close()
         print(f"Personal Assistant Database initialized: {self.db_path}")
     
-    def add_email(self, gmail_id, sender, subject, snippet, body=None, labels=None):
+    def add_email(self, gmail_id, sender, subject, snippet, body=None, labels=None, date_ts=None):
         """Add email to tracking"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        labels_json = dump_json(labels) if labels else None
         
-        labels_json = json.dumps(labels) if labels else None
-        
-        cursor.execute('''
-            INSERT OR IGNORE INTO emails 
-            (gmail_id, sender, subject, snippet, body, received_date, labels)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (gmail_id, sender, subject, snippet, body, datetime.now(), labels_json))
-        
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            conn.execute(self._stmts['INSERT_EMAIL'],
+                         (gmail_id, sender, subject, snippet, body, labels_json, date_ts))
+    
+    def add_emails_many(self, rows):
+        """Add many emails in a single transaction
+        
+        rows: iterable of (gmail_id, sender, subject, snippet, body, labels, date_ts)
+        """
+        with self._transaction() as conn:
+            conn.executemany(self._stmts['INSERT_EMAIL'], [
+                (gmail_id, sender, subject, snippet, body,
+                 dump_json(labels) if labels else None, date_ts)
+                for gmail_id, sender, subject, snippet, body, labels, date_ts in rows
+            ])
+    
+    def search_emails(self, query, limit=20):
+        """Full-text search over email subject, snippet and body, best matches first"""
+        with self._pool.connection() as conn:
+            if self.has_fts:
+                # Search for the text as one phrase, so quotes, hyphens and other
+                # FTS5 operator characters in user input are matched literally
+                phrase = '"' + query.replace('"', '""') + '"'
+                cursor = conn.execute(self._stmts['SEARCH_EMAILS'], (phrase, limit))
+            else:
+                escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                pattern = f"%{escaped}%"
+                cursor = conn.execute(self._stmts['SEARCH_EMAILS_LIKE'],
+                                      (pattern, pattern, pattern, limit))
+            return cursor.fetchall()
+    
+    def get_known_gmail_ids(self, gmail_ids, need_body=False):
+        """Return the subset of gmail_ids that are already stored
+        
+        With need_body=True, emails stored without their body (NULL) don't count.
+        """
+        gmail_ids = list(gmail_ids)
+        known = set()
+        body_filter = ' AND body IS NOT NULL' if need_body else ''
+        
+        with self.connection() as conn:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(gmail_ids), 500):
+                chunk = gmail_ids[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                known.update(row[0] for row in conn.execute(
+                    f"SELECT gmail_id FROM emails WHERE gmail_id IN ({placeholders}){body_filter}",
+                    chunk))
+        
+        return known
     
     def create_notification(self, type, title, message, priority='medium', scheduled_for=None):
         """Create a new notification"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO notifications (type, title, message, priority, scheduled_for)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (type, title, message, priority, scheduled_for))
+        if isinstance(priority, str):
+            priority = priority_level(priority)
         
-        notification_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return notification_id
+        with self.connection() as conn:
+            cursor = conn.execute(self._stmts['INSERT_NOTIFICATION'],
+                                  (type, title, message, priority, scheduled_for))
+            return cursor.lastrowid
     
     def log_study_session(self, subject, topic, duration_minutes, study_type='reading'):
         """Log a study session"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO study_sessions 
-            (subject, topic, duration_minutes, study_type, session_date)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (subject, topic, duration_minutes, study_type, datetime.now().date()))
-        
-        session_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.execute(self._stmts['INSERT_STUDY_SESSION'],
+                                  (subject, topic, duration_minutes, study_type))
+            return cursor.lastrowid
+    
+    def log_study_sessions_many(self, sessions):
+        """Log many study sessions in a single transaction
         
-        return session_id
+        sessions: iterable of (subject, topic, duration_minutes, study_type)
+        """
+        with self._transaction() as conn:
+            conn.executemany(self._stmts['INSERT_STUDY_SESSION'], sessions)
     
     def add_learning_resource(self, title, resource_type, subject, url=None, description=None):
         """Add a learning resource"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO learning_resources 
-            (title, type, subject, url, description)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (title, resource_type, subject, url, description))
-        
-        resource_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return resource_id
+        with self.connection() as conn:
+            cursor = conn.execute(self._stmts['INSERT_LEARNING_RESOURCE'],
+                                  (title, resource_type, subject, url, description))
+            return cursor.lastrowid
     
     def create_coding_project(self, name, description, language, local_path=None):
         """Create a new coding project"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO coding_projects 
-            (name, description, language, local_path)
-            VALUES (?, ?, ?, ?)
-        ''', (name, description, language, local_path))
-        
-        project_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return project_id
+        with self.connection() as conn:
+            cursor = conn.execute(self._stmts['INSERT_CODING_PROJECT'],
+                                  (name, description, language, local_path))
+            return cursor.lastrowid
     
     def log_nlp_task(self, task_name, task_type, dataset_name=None, model_used=None):
         """Log an NLP task/experiment"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO nlp_tasks 
-            (task_name, task_type, dataset_name, model_used)
-            VALUES (?, ?, ?, ?)
-        ''', (task_name, task_type, dataset_name, model_used))
-        
-        task_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return task_id
+        with self.connection() as conn:
+            cursor = conn.execute(self._stmts['INSERT_NLP_TASK'],
+                                  (task_name, task_type, dataset_name, model_used))
+            return cursor.lastrowid
     
     def get_pending_notifications(self):
         """Get all unread notifications"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM notifications 
-            WHERE is_read = FALSE 
-            ORDER BY priority DESC, created_at DESC
-        ''')
-        
-        notifications = cursor.fetchall()
-        conn.close()
-        
-        return notifications
+        with self._pool.connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.row_factory = _pending_notification_row
+            return cursor.execute(self._stmts['SELECT_PENDING_NOTIFICATIONS']).fetchall()
     
     def get_study_progress(self, subject=None, days=7):
         """Get study progress for the last N days"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        date_filter = datetime.now().date() - timedelta(days=days)
-        
-        if subject:
-            cursor.execute('''
-                SELECT subject, COUNT(*) as sessions, SUM(duration_minutes) as total_minutes
-                FROM study_sessions 
-                WHERE session_date >= ? AND subject = ?
-                GROUP BY subject
-            ''', (date_filter, subject))
-        else:
-            cursor.execute('''
-                SELECT subject, COUNT(*) as sessions, SUM(duration_minutes) as total_minutes
-                FROM study_sessions 
-                WHERE session_date >= ?
-                GROUP BY subject
-                ORDER BY total_minutes DESC
-            ''', (date_filter,))
-        
-        progress = cursor.fetchall()
-        conn.close()
-        
-        return progress
+        date_filter = (datetime.now().date() - timedelta(days=days)).isoformat()
+        
+        with self._pool.connection() as conn:
+            if subject:
+                cursor = conn.execute(self._stmts['SELECT_STUDY_PROGRESS_SUBJECT'],
+                                      (date_filter, subject))
+            else:
+                cursor = conn.execute(self._stmts['SELECT_STUDY_PROGRESS'], (date_filter,))
+            
+            return cursor.fetchall()
 
-def setup_sample_data():
-    """Add some sample data to test the system"""
-    db = PersonalAssistantDB()
-    
-    print("Adding sample data...")
+def setup_sample_data(db=None):
+    """Add some sample data to test the system (skipped if data already exists)
     
-    # Sample notifications
-    db.create_notification('reminder', 'Study NLP', 'Time for daily NLP learning session', 'high')
-    db.create_notification('email', 'Important Email', 'You have 3 unread important emails', 'medium')
-    db.create_notification('coding', 'Code Review', 'Complete code review for Python project', 'medium')
+    Returns True if sample rows were added, False if seeding was skipped.
+    """
+    if db is None:
+        db = PersonalAssistantDB()
     
-    # Sample study sessions
-    db.log_study_session('NLP', 'Text Preprocessing', 60, 'practice')
-    db.log_study_session('Python', 'Data Structures', 45, 'coding')
-    db.log_study_session('Machine Learning', 'Neural Networks', 90, 'reading')
+    if db.execute("SELECT 1 FROM notifications LIMIT 1"):
+        print("Sample data already present, skipping")
+        return False
     
-    # Sample learning resources
-    db.add_learning_resource('Natural Language Processing with Python', 'book', 'nlp', 
-                           'https://nltk.org/book/', 'Comprehensive NLP guide')
-    db.add_learning_resource('Python Crash Course', 'book', 'coding',
-                           description='Great Python learning resource')
-    
-    # Sample coding projects
-    db.create_coding_project('Personal Assistant', 'AI-powered personal assistant', 'python')
-    db.create_coding_project('Text Classifier', 'NLP text classification tool', 'python')
+    print("Adding sample data...")
     
-    # Sample NLP tasks
-    db.log_nlp_task('Sentiment Analysis', 'sentiment_analysis', 'IMDB Reviews', 'BERT')
-    db.log_nlp_task('Named Entity Recognition', 'ner', 'CoNLL-2003', 'spaCy')
+    # One transaction for all sample rows instead of one commit per insert
+    with db.bulk():
+        # Sample notifications
+        db.create_notification('reminder', 'Study NLP', 'Time for daily NLP learning session', 'high')
+        db.create_notification('email', 'Important Email', 'You have 3 unread important emails', 'medium')
+        db.create_notification('coding', 'Code Review', 'Complete code review for Python project', 'medium')
+        
+        # Sample study sessions
+        db.log_study_sessions_many([
+            ('NLP', 'Text Preprocessing', 60, 'practice'),
+            ('Python', 'Data Structures', 45, 'coding'),
+            ('Machine Learning', 'Neural Networks', 90, 'reading'),
+        ])
+        
+        # Sample learning resources
+        db.add_learning_resource('Natural Language Processing with Python', 'book', 'nlp', 
+                               'https://nltk.org/book/', 'Comprehensive NLP guide')
+        db.add_learning_resource('Python Crash Course', 'book', 'coding',
+                               description='Great Python learning resource')
+        
+        # Sample coding projects
+        db.create_coding_project('Personal Assistant', 'AI-powered personal assistant', 'python')
+        db.create_coding_project('Text Classifier', 'NLP text classification tool', 'python')
+        
+        # Sample NLP tasks
+        db.log_nlp_task('Sentiment Analysis', 'sentiment_analysis', 'IMDB Reviews', 'BERT')
+        db.log_nlp_task('Named Entity Recognition', 'ner', 'CoNLL-2003', 'spaCy')
     
     print("Sample data added successfully!")
     print(f"Database location: {os.path.abspath(db.db_path)}")
+    return True
 
-if __name__ == "__main__":
-    setup_sample_data()
-    
-    # Test the database
-    db = PersonalAssistantDB()
-    
+def demo(db):
+    """Print a short status report of the database contents"""
     print("\n" + "="*60)
     print("PERSONAL ASSISTANT DATABASE STATUS")
     print("="*60)
@@ -348,14 +649,21 @@ if __name__ == "__main__":
     notifications = db.get_pending_notifications()
     print(f"\n📢 Pending Notifications: {len(notifications)}")
     for notif in notifications:
-        print(f"  • {notif[2]} ({notif[1]}) - Priority: {notif[4]}")
+        print(f"  • {notif['title']} ({notif['type']}) - Priority: {notif['priority']}")
     
     # Show study progress
     progress = db.get_study_progress()
     print(f"\n📚 Study Progress (Last 7 days):")
     for prog in progress:
-        hours = prog[2] / 60 if prog[2] else 0
-        print(f"  • {prog[0]}: {prog[1]} sessions, {hours:.1f} hours")
+        hours = prog['total_minutes'] / 60 if prog['total_minutes'] else 0
+        print(f"  • {prog['subject']}: {prog['sessions']} sessions, {hours:.1f} hours")
     
     print(f"\n🎉 Your personal assistant database is ready!")
-    print("Next: Set up Gmail integration and notification system")
\ No newline at end of file
+    print("Next: Set up Gmail integration and notification system")
+
+if __name__ == "__main__":
+    db = PersonalAssistantDB()
+    setup_sample_data(db)
+    
+    # Test the database
+    demo(db)
\ No newline at end of file
@@ -4,9 +4,11 @@ Personal Assistant Setup Script
 Run this first to set up your personal assistant
 """
 
+import importlib.util
 import os
 import subprocess
 import sys
+from pathlib import Path
 
 def check_python_version():
     """Check if Python version is compatible"""
@@ -20,25 +22,41 @@ def check_python_version():
 
 def install_packages():
     """Install required Python packages"""
-    packages = [
-        "schedule",
-        "google-auth",
-        "google-auth-oauthlib", 
-        "google-auth-httplib2",
-        "google-api-python-client"
-    ]
+    # pip package name -> module it provides
+    packages = {
+        "schedule": "schedule",
+        "google-auth": "google.auth",
+        "google-auth-oauthlib": "google_auth_oauthlib",
+        "google-auth-httplib2": "google_auth_httplib2",
+        "google-api-python-client": "googleapiclient"
+    }
     
     print("📦 Installing required packages...")
     
-    for package in packages:
+    missing = []
+    for package, module in packages.items():
         try:
-            print(f"   Installing {package}...")
-            subprocess.check_call([sys.executable, "-m", "pip", "install", package, "--quiet"])
-            print(f"   ✅ {package} installed")
-        except subprocess.CalledProcessError:
-            print(f"   ❌ Failed to install {package}")
-            print(f"   Try manually: pip install {package}")
-            return False
+            installed = importlib.util.find_spec(module) is not None
+        except ModuleNotFoundError:
+            installed = False
+        
+        if installed:
+            print(f"   ✅ {package} already installed")
+        else:
+            missing.append(package)
+    
+    if not missing:
+        return True
+    
+    # One pip run resolves every package together instead of once per package
+    try:
+        print(f"   Installing {', '.join(missing)}...")
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "--quiet", *missing])
+        print(f"   ✅ {len(missing)} package(s) installed")
+    except subprocess.CalledProcessError:
+        print("   ❌ Failed to install packages")
+        print(f"   Try manually: pip install {' '.join(missing)}")
+        return False
     
     return True
 
@@ -53,18 +71,19 @@ def create_directory_structure():
     print("📁 Creating directory structure...")
     
     for directory in directories:
-        if not os.path.exists(directory):
+        # Let mkdir report existence instead of checking first
+        try:
             os.makedirs(directory)
             print(f"   ✅ Created {directory}/")
-        else:
+        except FileExistsError:
             print(f"   📁 {directory}/ already exists")
 
 def check_required_files():
     """Check if all required files are present"""
     required_files = [
-        "personal_assistant_db.py",
+        "personal_ass_database.py",
         "gmail_integration.py", 
-        "study_assistant.py",
+        "study_learning_assit.py",
         "main_assistant.py"
     ]
     
@@ -84,9 +103,11 @@ def setup_database():
     """Initialize the database with sample data"""
     try:
         print("🗄️  Setting up database...")
-        from personal_assistant_db import setup_sample_data
-        setup_sample_data()
-        print("   ✅ Database initialized with sample data")
+        from personal_ass_database import setup_sample_data
+        if setup_sample_data():
+            print("   ✅ Database initialized with sample data")
+        else:
+            print("   ✅ Database ready (existing data kept)")
         return True
     except ImportError as e:
         print(f"   ❌ Database setup failed: {e}")
@@ -119,10 +140,9 @@ CLAUDE_DATA_PATH = "assistant_data"
 AUTO_EXPORT_INTERVAL = 60  # minutes
 """
     
-    config_file = "config.py"
-    if not os.path.exists(config_file):
-        with open(config_file, 'w') as f:
-            f.write(config_content)
+    config_file = Path("config.py")
+    if not config_file.exists():
+        config_file.write_text(config_content, encoding='utf-8')
         print(f"✅ Created {config_file}")
     else:
         print(f"📁 {config_file} already exists")
@@ -287,8 +307,7 @@ Potential additions:
 **Happy Learning! 🎓**
 """
     
-    with open("QUICK_START.md", 'w') as f:
-        f.write(guide_content)
+    Path("QUICK_START.md").write_text(guide_content, encoding='utf-8')
     
     print("✅ Created QUICK_START.md guide")
 
@@ -1,122 +1,380 @@
 import random
 import json
-from datetime import datetime, timedelta
+from datetime import date, timedelta
 import os
 import re
+import sys
+import time
+from collections import deque, namedtuple
+from itertools import islice
+from types import MappingProxyType
+
+# Study topics and resources
+_STUDY_TOPICS = MappingProxyType({
+    'nlp': MappingProxyType({
+        'beginner': (
+            'Text preprocessing', 'Tokenization', 'Stop words removal',
+            'Stemming and Lemmatization', 'Bag of Words', 'TF-IDF'
+        ),
+        'intermediate': (
+            'Word embeddings', 'Word2Vec', 'GloVe', 'Sentiment analysis',
+            'Named Entity Recognition', 'Part-of-speech tagging'
+        ),
+        'advanced': (
+            'BERT and Transformers', 'GPT models', 'Attention mechanism',
+            'Sequence-to-sequence models', 'Transfer learning in NLP'
+        )
+    }),
+    'python': MappingProxyType({
+        'beginner': (
+            'Variables and data types', 'Control structures', 'Functions',
+            'Lists and dictionaries', 'File handling', 'Exception handling'
+        ),
+        'intermediate': (
+            'Object-oriented programming', 'Decorators', 'Generators',
+            'Regular expressions', 'Working with APIs', 'Database connections'
+        ),
+        'advanced': (
+            'Metaclasses', 'Async programming', 'Performance optimization',
+            'Design patterns', 'Testing frameworks', 'Package development'
+        )
+    }),
+    'machine_learning': MappingProxyType({
+        'beginner': (
+            'Supervised vs Unsupervised learning', 'Linear regression',
+            'Logistic regression', 'Decision trees', 'Cross-validation'
+        ),
+        'intermediate': (
+            'Random forests', 'SVM', 'K-means clustering', 'Neural networks',
+            'Feature engineering', 'Model evaluation metrics'
+        ),
+        'advanced': (
+            'Deep learning', 'Convolutional networks', 'Recurrent networks',
+            'Ensemble methods', 'Hyperparameter tuning', 'MLOps'
+        )
+    })
+})
+
+# Flat (subject, level) -> frozenset of topics, for one-lookup set arithmetic
+# in suggest_study_topic
+_TOPIC_INDEX = MappingProxyType({
+    (subject.lower(), level): frozenset(topics)
+    for subject, levels in _STUDY_TOPICS.items()
+    for level, topics in levels.items()
+})
+
+# Study queries, kept as shared constants so the connection's statement
+# cache reuses the compiled SQL across calls
+# One round-trip returns both the recent sessions (for topic suggestions) and
+# the per-subject aggregates (for recommendations), newest first
+_SQL_RECENT_PREFETCH = '''
+    WITH r AS (
+        SELECT subject, topic, session_date, duration_minutes 
+        FROM study_sessions 
+        WHERE session_date >= ?
+    )
+    SELECT 'topic' AS kind, subject, topic, session_date, 
+           NULL AS sessions, NULL AS avg_duration
+    FROM r
+    UNION ALL
+    SELECT 'agg', subject, NULL, MAX(session_date), COUNT(*), AVG(duration_minutes)
+    FROM r
+    GROUP BY subject
+    ORDER BY session_date DESC
+'''
+
+# How long prefetched study activity is reused before querying again (seconds)
+RECENT_CACHE_TTL = 60
+
+# Coding challenges by difficulty
+_CODING_CHALLENGES = MappingProxyType({
+    'beginner': (
+        "Write a function to reverse a string",
+        "Find the largest number in a list",
+        "Check if a number is prime",
+        "Count vowels in a string",
+        "Calculate factorial recursively"
+    ),
+    'intermediate': (
+        "Implement a binary search algorithm",
+        "Find the longest palindromic substring",
+        "Merge two sorted arrays",
+        "Implement a stack using arrays",
+        "Find duplicate elements in array"
+    ),
+    'advanced': (
+        "Implement a LRU cache",
+        "Find shortest path in a graph",
+        "Design a rate limiter",
+        "Implement a trie data structure",
+        "Solve N-Queens problem"
+    )
+})
+
+# Quiz question bank by subject and level
+_QUIZ_TEMPLATES = MappingProxyType({
+    'nlp': MappingProxyType({
+        'beginner': (
+            "What is tokenization in NLP?",
+            "What are stop words?",
+            "Explain the difference between stemming and lemmatization",
+            "What is TF-IDF?",
+            "What is the bag of words model?"
+        ),
+        'intermediate': (
+            "How do word embeddings work?",
+            "What is the difference between Word2Vec and GloVe?",
+            "Explain sentiment analysis techniques",
+            "What is Named Entity Recognition?",
+            "How does part-of-speech tagging work?"
+        )
+    }),
+    'python': MappingProxyType({
+        'beginner': (
+            "What are the main data types in Python?",
+            "How do you handle exceptions in Python?",
+            "What is the difference between a list and a tuple?",
+            "How do you read a file in Python?",
+            "What is a function in Python?"
+        ),
+        'intermediate': (
+            "What is a decorator in Python?",
+            "How do generators work?",
+            "Explain object-oriented programming concepts",
+            "What are lambda functions?",
+            "How do you work with APIs in Python?"
+        )
+    })
+})
+
+# NLP project ideas by skill level
+_NLP_PROJECTS = MappingProxyType({
+    'beginner': (
+        {
+            'name': 'Sentiment Analysis Tool',
+            'description': 'Build a tool to analyze sentiment in movie reviews',
+            'libraries': ['nltk', 'sklearn'],
+            'difficulty': 'Easy',
+            'estimated_time': '1-2 weeks'
+        },
+        {
+            'name': 'Text Summarizer',
+            'description': 'Create an extractive text summarization tool',
+            'libraries': ['nltk', 'sumy'],
+            'difficulty': 'Easy-Medium',
+            'estimated_time': '1 week'
+        }
+    ),
+    'intermediate': (
+        {
+            'name': 'Chatbot with Intent Recognition',
+            'description': 'Build a chatbot that can understand user intents',
+            'libraries': ['spacy', 'rasa'],
+            'difficulty': 'Medium',
+            'estimated_time': '3-4 weeks'
+        },
+        {
+            'name': 'Named Entity Recognition System',
+            'description': 'Train a custom NER model for specific domains',
+            'libraries': ['spacy', 'transformers'],
+            'difficulty': 'Medium',
+            'estimated_time': '2-3 weeks'
+        }
+    ),
+    'advanced': (
+        {
+            'name': 'Question Answering System',
+            'description': 'Build a BERT-based QA system',
+            'libraries': ['transformers', 'pytorch'],
+            'difficulty': 'Hard',
+            'estimated_time': '4-6 weeks'
+        },
+        {
+            'name': 'Text Generation with GPT',
+            'description': 'Fine-tune GPT for domain-specific text generation',
+            'libraries': ['transformers', 'pytorch'],
+            'difficulty': 'Hard',
+            'estimated_time': '6-8 weeks'
+        }
+    )
+})
+
+# NLP learning path; fixed content, so built once (read-only, it is shared by every caller)
+_LEARNING_PATH = MappingProxyType({
+    'phase_1': MappingProxyType({
+        'title': 'NLP Fundamentals (4-6 weeks)',
+        'topics': (
+            'Text preprocessing and cleaning',
+            'Tokenization and normalization',
+            'Feature extraction (BoW, TF-IDF)',
+            'Basic text classification',
+            'Sentiment analysis'
+        ),
+        'projects': ('Movie review sentiment classifier',),
+        'resources': ('NLTK Book', 'Python for NLP tutorials')
+    }),
+    'phase_2': MappingProxyType({
+        'title': 'Intermediate NLP (6-8 weeks)',
+        'topics': (
+            'Word embeddings (Word2Vec, GloVe)',
+            'Named Entity Recognition',
+            'Part-of-speech tagging',
+            'Language modeling',
+            'Topic modeling'
+        ),
+        'projects': ('Custom NER system', 'Topic modeling for documents'),
+        'resources': ('spaCy documentation', 'Gensim tutorials')
+    }),
+    'phase_3': MappingProxyType({
+        'title': 'Advanced NLP (8-12 weeks)',
+        'topics': (
+            'Neural networks for NLP',
+            'Attention mechanism',
+            'Transformer architecture',
+            'BERT and its variants',
+            'Fine-tuning pre-trained models'
+        ),
+        'projects': ('BERT-based text classifier', 'Question answering system'),
+        'resources': ('Transformers library', 'Papers on ArXiv')
+    })
+})
+
+# subject -> every (topic, level) pair, beginner to advanced, for study plans
+_FLAT_TOPICS = MappingProxyType({
+    subject: tuple((topic, level)
+                   for level in ('beginner', 'intermediate', 'advanced')
+                   for topic in levels.get(level, ()))
+    for subject, levels in _STUDY_TOPICS.items()
+})
+
+# One week of a study plan; use ._asdict() where a dict is needed (e.g. JSON)
+WeekPlan = namedtuple('WeekPlan', ('week', 'topics', 'estimated_hours'))
+
+# Menu number prompts accept positive integers only
+_INT_RE = re.compile(r'^\s*([1-9]\d*)\s*$')
+
+def _parse_int(text, default):
+    """Positive integer typed at a prompt, or default for blank/invalid input"""
+    match = _INT_RE.match(text)
+    return int(match.group(1)) if match else default
+
+# Achievement notification text for track_study_session
+_SESSION_DONE_TITLE = 'Study Session Completed! 🎉'
+_SESSION_DONE_MESSAGE = 'Great job! You studied {topic} ({subject}) for {hours:.1f} hours'.format
+
+# Shared fallback for lookup misses, so none allocates a fresh {}
+_EMPTY_DICT = MappingProxyType({})
+
+def _norm(value):
+    """Normalize a subject/level name once; interned so dict lookups compare by identity"""
+    return sys.intern(value.strip().lower())
+
+class _ShuffledCycle:
+    """Items in random order; picks walk through them without repeats, and the
+    order is reshuffled after every full pass"""
+    __slots__ = ('_items', '_pending')
+    
+    def __init__(self, items):
+        self._items = tuple(items)
+        self._pending = deque()
+    
+    def __len__(self):
+        return len(self._items)
+    
+    def take(self, count):
+        """Take count distinct items (at most len(self)), starting a new shuffled pass when needed"""
+        picked = []
+        for _ in range(min(count, len(self._items))):
+            if not self._pending:
+                # Items already picked in this call go to the back of the new pass
+                order = random.sample(self._items, len(self._items))
+                self._pending.extend([item for item in order if item not in picked])
+                self._pending.extend([item for item in order if item in picked])
+            picked.append(self._pending.popleft())
+        return picked
+
 
 class StudyAssistant:
     def __init__(self, db_instance):
         """Initialize study assistant with database"""
         self.db = db_instance
         
-        # Study topics and resources
-        self.study_topics = {
-            'nlp': {
-                'beginner': [
-                    'Text preprocessing', 'Tokenization', 'Stop words removal',
-                    'Stemming and Lemmatization', 'Bag of Words', 'TF-IDF'
-                ],
-                'intermediate': [
-                    'Word embeddings', 'Word2Vec', 'GloVe', 'Sentiment analysis',
-                    'Named Entity Recognition', 'Part-of-speech tagging'
-                ],
-                'advanced': [
-                    'BERT and Transformers', 'GPT models', 'Attention mechanism',
-                    'Sequence-to-sequence models', 'Transfer learning in NLP'
-                ]
-            },
-            'python': {
-                'beginner': [
-                    'Variables and data types', 'Control structures', 'Functions',
-                    'Lists and dictionaries', 'File handling', 'Exception handling'
-                ],
-                'intermediate': [
-                    'Object-oriented programming', 'Decorators', 'Generators',
-                    'Regular expressions', 'Working with APIs', 'Database connections'
-                ],
-                'advanced': [
-                    'Metaclasses', 'Async programming', 'Performance optimization',
-                    'Design patterns', 'Testing frameworks', 'Package development'
-                ]
-            },
-            'machine_learning': {
-                'beginner': [
-                    'Supervised vs Unsupervised learning', 'Linear regression',
-                    'Logistic regression', 'Decision trees', 'Cross-validation'
-                ],
-                'intermediate': [
-                    'Random forests', 'SVM', 'K-means clustering', 'Neural networks',
-                    'Feature engineering', 'Model evaluation metrics'
-                ],
-                'advanced': [
-                    'Deep learning', 'Convolutional networks', 'Recurrent networks',
-                    'Ensemble methods', 'Hyperparameter tuning', 'MLOps'
-                ]
-            }
-        }
+        self.study_topics = _STUDY_TOPICS
+        self.coding_challenges = _CODING_CHALLENGES
+        self._flat_topics = _FLAT_TOPICS
         
-        # Coding challenges by difficulty
-        self.coding_challenges = {
-            'beginner': [
-                "Write a function to reverse a string",
-                "Find the largest number in a list",
-                "Check if a number is prime",
-                "Count vowels in a string",
-                "Calculate factorial recursively"
-            ],
-            'intermediate': [
-                "Implement a binary search algorithm",
-                "Find the longest palindromic substring",
-                "Merge two sorted arrays",
-                "Implement a stack using arrays",
-                "Find duplicate elements in array"
-            ],
-            'advanced': [
-                "Implement a LRU cache",
-                "Find shortest path in a graph",
-                "Design a rate limiter",
-                "Implement a trie data structure",
-                "Solve N-Queens problem"
-            ]
-        }
+        # Shuffled cycles of the static lists; quiz cycles are made on first use
+        self._challenge_cycles = {difficulty: _ShuffledCycle(challenges)
+                                  for difficulty, challenges in self.coding_challenges.items()}
+        self._quiz_cycles = {}
+        
+        # Query cutoff dates, recomputed only when the day changes
+        self._cutoff_day = None
+        self._cutoffs = {}
+        
+        # (fetched_at, recent_topics, recent_activity) from _prefetch_recent
+        self._recent_cache = None
+    
+    def _cutoff(self, today, days):
+        """ISO date `days` before today, cached for the rest of the day"""
+        if self._cutoff_day != today:
+            self._cutoff_day = today
+            self._cutoffs = {}
+        
+        cutoff = self._cutoffs.get(days)
+        if cutoff is None:
+            cutoff = self._cutoffs[days] = (today - timedelta(days=days)).isoformat()
+        return cutoff
+    
+    def _prefetch_recent(self, days=14):
+        """Recent sessions per subject and per-subject aggregates, cached for RECENT_CACHE_TTL
+        
+        Returns (recent_topics, recent_activity): recent_topics maps subject to
+        [(session_date, topic), ...] newest first; recent_activity is a list of
+        (subject, sessions, avg_duration, last_session) ordered by last_session DESC.
+        """
+        now = time.monotonic()
+        if self._recent_cache is not None and now - self._recent_cache[0] < RECENT_CACHE_TTL:
+            return self._recent_cache[1], self._recent_cache[2]
+        
+        recent_topics = {}
+        recent_activity = []
+        for kind, subject, topic, session_date, sessions, avg_duration in self.db.execute(
+                _SQL_RECENT_PREFETCH, (self._cutoff(date.today(), days),)):
+            if kind == 'topic':
+                recent_topics.setdefault(subject, []).append((session_date, topic))
+            else:
+                recent_activity.append((subject, sessions, avg_duration, session_date))
+        
+        self._recent_cache = (now, recent_topics, recent_activity)
+        return recent_topics, recent_activity
     
     def suggest_study_topic(self, subject, level='beginner'):
         """Suggest a study topic based on recent progress"""
-        conn = self.db.db.connect(self.db.db_path)
-        cursor = conn.cursor()
-        
-        # Get recently studied topics
-        cursor.execute('''
-            SELECT topic FROM study_sessions 
-            WHERE subject = ? AND session_date >= ?
-            ORDER BY session_date DESC LIMIT 5
-        ''', (subject, datetime.now().date() - timedelta(days=7)))
-        
-        recent_topics = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        
-        # Get all topics for the subject and level
-        available_topics = self.study_topics.get(subject.lower(), {}).get(level, [])
+        # Get all topics for the subject and level; unknown ones need no DB work
+        available_topics = _TOPIC_INDEX.get((_norm(subject), _norm(level)))
         
         if not available_topics:
             return f"No topics available for {subject} at {level} level"
         
+        # Get recently studied topics (last 5 within a week)
+        cutoff = self._cutoff(date.today(), 7)
+        recent_sessions = self._prefetch_recent()[0].get(subject, ())
+        recent_topics = [topic for session_date, topic in recent_sessions
+                         if session_date >= cutoff][:5]
+        
         # Filter out recently studied topics
-        unstudied_topics = [topic for topic in available_topics 
-                          if topic not in recent_topics]
+        unstudied_topics = available_topics.difference(recent_topics)
         
         # If all topics recently studied, suggest review
         if not unstudied_topics:
             return f"Consider reviewing: {random.choice(recent_topics)}"
         
-        return random.choice(unstudied_topics)
+        return random.choice(tuple(unstudied_topics))
     
     def create_study_plan(self, subject, hours_per_week=5, weeks=4):
         """Create a personalized study plan"""
-        topics = []
-        for level in ['beginner', 'intermediate', 'advanced']:
-            level_topics = self.study_topics.get(subject.lower(), {}).get(level, [])
-            topics.extend([(topic, level) for topic in level_topics])
+        topics = self._flat_topics.get(_norm(subject), ())
         
         # Calculate topics per week
         topics_per_week = len(topics) // weeks if topics else 1
@@ -130,57 +388,54 @@ class StudyAssistant:
             'weekly_schedule': []
         }
         
-        # Distribute topics across weeks
+        # Distribute topics across weeks: one pass over the shared topic tuple,
+        # each week taking the next run of topics
+        remaining = iter(topics)
         for week in range(weeks):
-            start_idx = week * topics_per_week
-            end_idx = min((week + 1) * topics_per_week, len(topics))
-            week_topics = topics[start_idx:end_idx]
+            week_topics = tuple(islice(remaining, topics_per_week))
             
-            study_plan['weekly_schedule'].append({
-                'week': week + 1,
-                'topics': week_topics,
-                'estimated_hours': len(week_topics) * hours_per_topic
-            })
+            study_plan['weekly_schedule'].append(
+                WeekPlan(week + 1, week_topics, len(week_topics) * hours_per_topic))
         
         return study_plan
     
     def get_coding_challenge(self, difficulty='beginner'):
         """Get a random coding challenge"""
-        challenges = self.coding_challenges.get(difficulty, self.coding_challenges['beginner'])
-        return random.choice(challenges)
+        cycle = self._challenge_cycles.get(_norm(difficulty)) or self._challenge_cycles['beginner']
+        return cycle.take(1)[0]
     
     def track_study_session(self, subject, topic, duration_minutes, notes=None, difficulty_rating=3):
         """Track a completed study session"""
-        session_id = self.db.log_study_session(subject, topic, duration_minutes)
-        
-        # Create achievement notification
-        hours = duration_minutes / 60
-        self.db.create_notification(
-            type='study_achievement',
-            title=f'Study Session Completed! 🎉',
-            message=f'Great job! You studied {topic} ({subject}) for {hours:.1f} hours',
-            priority='low'
-        )
+        # Session row and its notification commit together
+        self._recent_cache = None
+        with self.db.bulk():
+            session_id = self.db.log_study_session(subject, topic, duration_minutes)
+            
+            # Create achievement notification
+            self.db.create_notification(
+                type='study_achievement',
+                title=_SESSION_DONE_TITLE,
+                message=_SESSION_DONE_MESSAGE(topic=topic, subject=subject, hours=duration_minutes / 60),
+                priority='low'
+            )
         
         return session_id
     
+    def track_study_sessions(self, sessions):
+        """Track many completed study sessions in a single transaction
+        
+        sessions: iterable of (subject, topic, duration_minutes)
+        """
+        with self.db.bulk():
+            return [self.track_study_session(subject, topic, duration_minutes)
+                    for subject, topic, duration_minutes in sessions]
+    
     def get_study_recommendations(self):
         """Get personalized study recommendations"""
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
+        today = date.today()
         
         # Get recent study patterns
-        cursor.execute('''
-            SELECT subject, COUNT(*) as sessions, AVG(duration_minutes) as avg_duration,
-                   MAX(session_date) as last_session
-            FROM study_sessions 
-            WHERE session_date >= ?
-            GROUP BY subject
-            ORDER BY last_session DESC
-        ''', (datetime.now().date() - timedelta(days=14),))
-        
-        recent_activity = cursor.fetchall()
-        conn.close()
+        recent_activity = self._prefetch_recent()[1]
         
         recommendations = []
         
@@ -192,7 +447,7 @@ class StudyAssistant:
             })
         else:
             for subject, sessions, avg_duration, last_session in recent_activity:
-                days_since = (datetime.now().date() - datetime.strptime(last_session, '%Y-%m-%d').date()).days
+                days_since = (today - date.fromisoformat(last_session)).days
                 
                 if days_since > 3:
                     recommendations.append({
@@ -213,46 +468,15 @@ class StudyAssistant:
     def generate_quiz_questions(self, subject, level='beginner', num_questions=5):
         """Generate quiz questions for a subject"""
         # This is a simplified version - in practice, you'd have a question bank
-        question_templates = {
-            'nlp': {
-                'beginner': [
-                    "What is tokenization in NLP?",
-                    "What are stop words?",
-                    "Explain the difference between stemming and lemmatization",
-                    "What is TF-IDF?",
-                    "What is the bag of words model?"
-                ],
-                'intermediate': [
-                    "How do word embeddings work?",
-                    "What is the difference between Word2Vec and GloVe?",
-                    "Explain sentiment analysis techniques",
-                    "What is Named Entity Recognition?",
-                    "How does part-of-speech tagging work?"
-                ]
-            },
-            'python': {
-                'beginner': [
-                    "What are the main data types in Python?",
-                    "How do you handle exceptions in Python?",
-                    "What is the difference between a list and a tuple?",
-                    "How do you read a file in Python?",
-                    "What is a function in Python?"
-                ],
-                'intermediate': [
-                    "What is a decorator in Python?",
-                    "How do generators work?",
-                    "Explain object-oriented programming concepts",
-                    "What are lambda functions?",
-                    "How do you work with APIs in Python?"
-                ]
-            }
-        }
-        
-        questions = question_templates.get(subject.lower(), {}).get(level, [])
-        if not questions:
-            return ["No questions available for this topic"]
-        
-        return random.sample(questions, min(num_questions, len(questions)))
+        key = (_norm(subject), _norm(level))
+        cycle = self._quiz_cycles.get(key)
+        if cycle is None:
+            questions = _QUIZ_TEMPLATES.get(key[0], _EMPTY_DICT).get(key[1], ())
+            if not questions:
+                return ["No questions available for this topic"]
+            cycle = self._quiz_cycles[key] = _ShuffledCycle(questions)
+        
+        return cycle.take(num_questions)
 
 class NLPLearningAssistant:
     """Specialized assistant for NLP learning"""
@@ -275,104 +499,115 @@ class NLPLearningAssistant:
             'qa': ['SQuAD', 'Natural Questions'],
             'summarization': ['CNN/DailyMail', 'XSum']
         }
+        
+        # Shuffled cycle of project ideas per skill level
+        self._project_cycles = {level: _ShuffledCycle(projects)
+                                for level, projects in _NLP_PROJECTS.items()}
     
     def suggest_nlp_project(self, skill_level='beginner'):
         """Suggest NLP projects based on skill level"""
-        projects = {
-            'beginner': [
-                {
-                    'name': 'Sentiment Analysis Tool',
-                    'description': 'Build a tool to analyze sentiment in movie reviews',
-                    'libraries': ['nltk', 'sklearn'],
-                    'difficulty': 'Easy',
-                    'estimated_time': '1-2 weeks'
-                },
-                {
-                    'name': 'Text Summarizer',
-                    'description': 'Create an extractive text summarization tool',
-                    'libraries': ['nltk', 'sumy'],
-                    'difficulty': 'Easy-Medium',
-                    'estimated_time': '1 week'
-                }
-            ],
-            'intermediate': [
-                {
-                    'name': 'Chatbot with Intent Recognition',
-                    'description': 'Build a chatbot that can understand user intents',
-                    'libraries': ['spacy', 'rasa'],
-                    'difficulty': 'Medium',
-                    'estimated_time': '3-4 weeks'
-                },
-                {
-                    'name': 'Named Entity Recognition System',
-                    'description': 'Train a custom NER model for specific domains',
-                    'libraries': ['spacy', 'transformers'],
-                    'difficulty': 'Medium',
-                    'estimated_time': '2-3 weeks'
-                }
-            ],
-            'advanced': [
-                {
-                    'name': 'Question Answering System',
-                    'description': 'Build a BERT-based QA system',
-                    'libraries': ['transformers', 'pytorch'],
-                    'difficulty': 'Hard',
-                    'estimated_time': '4-6 weeks'
-                },
-                {
-                    'name': 'Text Generation with GPT',
-                    'description': 'Fine-tune GPT for domain-specific text generation',
-                    'libraries': ['transformers', 'pytorch'],
-                    'difficulty': 'Hard',
-                    'estimated_time': '6-8 weeks'
-                }
-            ]
-        }
-        
-        return random.choice(projects.get(skill_level, projects['beginner']))
+        cycle = self._project_cycles.get(_norm(skill_level)) or self._project_cycles['beginner']
+        return cycle.take(1)[0]
     
     def create_nlp_learning_path(self):
         """Create a comprehensive NLP learning path"""
-        learning_path = {
-            'phase_1': {
-                'title': 'NLP Fundamentals (4-6 weeks)',
-                'topics': [
-                    'Text preprocessing and cleaning',
-                    'Tokenization and normalization',
-                    'Feature extraction (BoW, TF-IDF)',
-                    'Basic text classification',
-                    'Sentiment analysis'
-                ],
-                'projects': ['Movie review sentiment classifier'],
-                'resources': ['NLTK Book', 'Python for NLP tutorials']
-            },
-            'phase_2': {
-                'title': 'Intermediate NLP (6-8 weeks)',
-                'topics': [
-                    'Word embeddings (Word2Vec, GloVe)',
-                    'Named Entity Recognition',
-                    'Part-of-speech tagging',
-                    'Language modeling',
-                    'Topic modeling'
-                ],
-                'projects': ['Custom NER system', 'Topic modeling for documents'],
-                'resources': ['spaCy documentation', 'Gensim tutorials']
-            },
-            'phase_3': {
-                'title': 'Advanced NLP (8-12 weeks)',
-                'topics': [
-                    'Neural networks for NLP',
-                    'Attention mechanism',
-                    'Transformer architecture',
-                    'BERT and its variants',
-                    'Fine-tuning pre-trained models'
-                ],
-                'projects': ['BERT-based text classifier', 'Question answering system'],
-                'resources': ['Transformers library', 'Papers on ArXiv']
-            }
-        }
-        
-        return learning_path
+        return _LEARNING_PATH
+
+def _menu_suggest_topic(study_assistant, nlp_assistant, db):
+    subject = input("Subject (nlp/python/machine_learning): ").strip()
+    level = input("Level (beginner/intermediate/advanced): ").strip() or "beginner"
+    
+    suggestion = study_assistant.suggest_study_topic(subject, level)
+    print(f"\n💡 Suggested topic: {suggestion}")
+
+def _menu_track_session(study_assistant, nlp_assistant, db):
+    subject = input("Subject: ").strip()
+    topic = input("Topic studied: ").strip()
+    duration = _parse_int(input("Duration (minutes): "), None)
+    if duration is None:
+        print("❌ Duration must be a whole number of minutes")
+        return
+    notes = input("Notes (optional): ").strip() or None
+    
+    session_id = study_assistant.track_study_session(subject, topic, duration, notes)
+    print(f"✅ Study session logged! (ID: {session_id})")
+
+def _menu_study_plan(study_assistant, nlp_assistant, db):
+    subject = input("Subject for study plan: ").strip()
+    hours = _parse_int(input("Hours per week: "), 5)
+    weeks = _parse_int(input("Duration in weeks: "), 4)
+    
+    plan = study_assistant.create_study_plan(subject, hours, weeks)
+    print(f"\n📋 Study Plan for {subject}:")
+    for week_plan in plan['weekly_schedule']:
+        print(f"Week {week_plan.week} ({week_plan.estimated_hours} hours):")
+        for topic, level in week_plan.topics:
+            print(f"  - {topic} ({level})")
+
+def _menu_coding_challenge(study_assistant, nlp_assistant, db):
+    difficulty = input("Difficulty (beginner/intermediate/advanced): ").strip() or "beginner"
+    challenge = study_assistant.get_coding_challenge(difficulty)
+    print(f"\n💻 Coding Challenge: {challenge}")
+
+def _menu_nlp_project(study_assistant, nlp_assistant, db):
+    level = input("Your NLP skill level (beginner/intermediate/advanced): ").strip() or "beginner"
+    project = nlp_assistant.suggest_nlp_project(level)
+    print(f"\n🤖 NLP Project Suggestion:")
+    print(f"Name: {project['name']}")
+    print(f"Description: {project['description']}")
+    print(f"Libraries: {', '.join(project['libraries'])}")
+    print(f"Difficulty: {project['difficulty']}")
+    print(f"Estimated Time: {project['estimated_time']}")
+
+def _menu_recommendations(study_assistant, nlp_assistant, db):
+    recommendations = study_assistant.get_study_recommendations()
+    print(f"\n🎯 Study Recommendations:")
+    for i, rec in enumerate(recommendations, 1):
+        print(f"{i}. {rec['message']}")
+        print(f"   Action: {rec['action']}")
+
+def _menu_quiz(study_assistant, nlp_assistant, db):
+    subject = input("Subject for quiz: ").strip()
+    level = input("Level: ").strip() or "beginner"
+    num_q = _parse_int(input("Number of questions (1-10): "), 5)
+    
+    questions = study_assistant.generate_quiz_questions(subject, level, num_q)
+    print(f"\n❓ Quiz Questions for {subject} ({level}):")
+    for i, question in enumerate(questions, 1):
+        print(f"{i}. {question}")
+
+def _menu_progress(study_assistant, nlp_assistant, db):
+    progress = db.get_study_progress(days=14)
+    print(f"\n📊 Study Progress (Last 14 days):")
+    for subject, sessions, total_minutes in progress:
+        hours = total_minutes / 60 if total_minutes else 0
+        print(f"• {subject}: {sessions} sessions, {hours:.1f} hours")
+
+# Menu text, built once and printed with a single call per loop
+_MENU_BANNER = ("\n" + "="*60 + "\n"
+                "📚 PERSONAL STUDY ASSISTANT\n"
+                + "="*60 + "\n"
+                "1. Get study topic suggestion\n"
+                "2. Track study session\n"
+                "3. Create study plan\n"
+                "4. Get coding challenge\n"
+                "5. NLP project suggestion\n"
+                "6. Study recommendations\n"
+                "7. Generate quiz questions\n"
+                "8. View study progress\n"
+                "9. Exit")
+
+# Menu choice -> handler(study_assistant, nlp_assistant, db); "9" exits
+_MENU_HANDLERS = {
+    "1": _menu_suggest_topic,
+    "2": _menu_track_session,
+    "3": _menu_study_plan,
+    "4": _menu_coding_challenge,
+    "5": _menu_nlp_project,
+    "6": _menu_recommendations,
+    "7": _menu_quiz,
+    "8": _menu_progress,
+}
 
 def main_study_interface():
     """Main interface for the study assistant"""
@@ -383,92 +618,18 @@ def main_study_interface():
     nlp_assistant = NLPLearningAssistant(db)
     
     while True:
-        print("\n" + "="*60)
-        print("📚 PERSONAL STUDY ASSISTANT")
-        print("="*60)
-        print("1. Get study topic suggestion")
-        print("2. Track study session")
-        print("3. Create study plan")
-        print("4. Get coding challenge")
-        print("5. NLP project suggestion")
-        print("6. Study recommendations")
-        print("7. Generate quiz questions")
-        print("8. View study progress")
-        print("9. Exit")
+        print(_MENU_BANNER)
         
         choice = input("\nEnter your choice (1-9): ").strip()
         
-        if choice == "1":
-            subject = input("Subject (nlp/python/machine_learning): ").strip()
-            level = input("Level (beginner/intermediate/advanced): ").strip() or "beginner"
-            
-            suggestion = study_assistant.suggest_study_topic(subject, level)
-            print(f"\n💡 Suggested topic: {suggestion}")
-        
-        elif choice == "2":
-            subject = input("Subject: ").strip()
-            topic = input("Topic studied: ").strip()
-            duration = int(input("Duration (minutes): "))
-            notes = input("Notes (optional): ").strip() or None
-            
-            session_id = study_assistant.track_study_session(subject, topic, duration, notes)
-            print(f"✅ Study session logged! (ID: {session_id})")
-        
-        elif choice == "3":
-            subject = input("Subject for study plan: ").strip()
-            hours = int(input("Hours per week: ") or "5")
-            weeks = int(input("Duration in weeks: ") or "4")
-            
-            plan = study_assistant.create_study_plan(subject, hours, weeks)
-            print(f"\n📋 Study Plan for {subject}:")
-            for week_plan in plan['weekly_schedule']:
-                print(f"Week {week_plan['week']} ({week_plan['estimated_hours']} hours):")
-                for topic, level in week_plan['topics']:
-                    print(f"  - {topic} ({level})")
-        
-        elif choice == "4":
-            difficulty = input("Difficulty (beginner/intermediate/advanced): ").strip() or "beginner"
-            challenge = study_assistant.get_coding_challenge(difficulty)
-            print(f"\n💻 Coding Challenge: {challenge}")
-        
-        elif choice == "5":
-            level = input("Your NLP skill level (beginner/intermediate/advanced): ").strip() or "beginner"
-            project = nlp_assistant.suggest_nlp_project(level)
-            print(f"\n🤖 NLP Project Suggestion:")
-            print(f"Name: {project['name']}")
-            print(f"Description: {project['description']}")
-            print(f"Libraries: {', '.join(project['libraries'])}")
-            print(f"Difficulty: {project['difficulty']}")
-            print(f"Estimated Time: {project['estimated_time']}")
-        
-        elif choice == "6":
-            recommendations = study_assistant.get_study_recommendations()
-            print(f"\n🎯 Study Recommendations:")
-            for i, rec in enumerate(recommendations, 1):
-                print(f"{i}. {rec['message']}")
-                print(f"   Action: {rec['action']}")
-        
-        elif choice == "7":
-            subject = input("Subject for quiz: ").strip()
-            level = input("Level: ").strip() or "beginner"
-            num_q = int(input("Number of questions (1-10): ") or "5")
-            
-            questions = study_assistant.generate_quiz_questions(subject, level, num_q)
-            print(f"\n❓ Quiz Questions for {subject} ({level}):")
-            for i, question in enumerate(questions, 1):
-                print(f"{i}. {question}")
-        
-        elif choice == "8":
-            progress = db.get_study_progress(days=14)
-            print(f"\n📊 Study Progress (Last 14 days):")
-            for subject, sessions, total_minutes in progress:
-                hours = total_minutes / 60 if total_minutes else 0
-                print(f"• {subject}: {sessions} sessions, {hours:.1f} hours")
-        
-        elif choice == "9":
+        if choice == "9":
+            db.close()
             print("👋 Happy studying!")
             break
         
+        handler = _MENU_HANDLERS.get(choice)
+        if handler:
+            handler(study_assistant, nlp_assistant, db)
         else:
             print("❌ Invalid choice. Please try again.")
 